@@ -0,0 +1,157 @@
+"""
+Microbenchmarks for the degrees search.
+
+Usage: python benchmark.py frontier [sizes...]
+       python benchmark.py load [directory]
+       python benchmark.py search [directory] [pairs]
+"""
+
+import random
+import sys
+import time
+import tracemalloc
+
+import compact
+import degrees
+import weighted
+from util import Node, StackFrontier, QueueFrontier
+
+
+def bench_frontier(frontier_class, size):
+    """
+    Fills a frontier with size nodes, then drains it, interleaving a
+    membership check with every pop. Returns pops per second.
+    """
+    frontier = frontier_class()
+    for i in range(size):
+        frontier.add(Node(state=i, parent=None, action=None))
+
+    start = time.perf_counter()
+    while not frontier.empty():
+        node = frontier.remove()
+        frontier.contains_state(node.state)
+    elapsed = time.perf_counter() - start
+    return size / elapsed
+
+
+def frontier(args):
+    """
+    Pops per second for each frontier type at the given sizes.
+    """
+    sizes = [int(arg) for arg in args] or [10 ** 5, 10 ** 6]
+    for size in sizes:
+        for frontier_class in [StackFrontier, QueueFrontier]:
+            rate = bench_frontier(frontier_class, size)
+            print(f"{frontier_class.__name__:>14} size={size:>8}: {rate:,.0f} pops/s")
+
+
+def load_dicts(directory):
+    degrees.names, degrees.people, degrees.movies = {}, {}, {}
+    degrees.load_data(directory)
+    return degrees.names, degrees.people, degrees.movies
+
+
+def load_compact(directory):
+    return compact.CompactGraph.from_csv(directory)
+
+
+def load_snapshot(directory):
+    return compact.load(directory)
+
+
+def load(args):
+    """
+    Load time and retained memory of the dict-of-sets loader
+    versus the compact CSR graph and its memory-mapped snapshot.
+    """
+    directory = args[0] if args else "small"
+
+    # Make sure an up-to-date snapshot exists before timing it
+    compact.load(directory)
+
+    for name, loader in [("dict-of-sets", load_dicts), ("compact", load_compact),
+                         ("snapshot", load_snapshot)]:
+        start = time.perf_counter()
+        data = loader(directory)
+        elapsed = time.perf_counter() - start
+        del data
+
+        # Measured separately since tracing slows loading down considerably
+        tracemalloc.start()
+        data = loader(directory)
+        retained, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        del data
+        print(f"{name:>12}: {elapsed:.2f}s, retained {retained / 2 ** 20:.1f} MiB, "
+              f"peak {peak / 2 ** 20:.1f} MiB")
+
+
+def random_pairs(count, seed=0):
+    """
+    Returns count random (source, target) person_id pairs from degrees.people.
+    """
+    person_ids = sorted(degrees.people)
+    rng = random.Random(seed)
+    return [(rng.choice(person_ids), rng.choice(person_ids)) for _ in range(count)]
+
+
+def time_search(search, pairs):
+    """
+    Runs search on every pair, returning (seconds per query, path lengths).
+    """
+    lengths = []
+    start = time.perf_counter()
+    for source, target in pairs:
+        path = search(source, target)
+        lengths.append(None if path is None else len(path))
+    return (time.perf_counter() - start) / len(pairs), lengths
+
+
+SEARCHES = {
+    "bidirectional, person expansion":
+        lambda source, target: degrees.shortest_path(source, target, movie_nodes=False),
+    "bidirectional, movie nodes":
+        lambda source, target: degrees.shortest_path(source, target),
+    "one-sided BFS (frontier)":
+        lambda source, target: degrees.shortest_path(source, target, bidirectional=False),
+    "one-sided BFS tree":
+        lambda source, target: degrees.path_from_tree(degrees.bfs_tree(source, {target}), target),
+    "dijkstra, unit cost":
+        lambda source, target: weighted.cheapest_path(source, target),
+}
+
+
+def search(args):
+    """
+    Mean time per query of each search strategy over random pairs,
+    checking that they agree on path lengths.
+    """
+    directory = args[0] if len(args) > 0 else "small"
+    count = int(args[1]) if len(args) > 1 else 100
+    degrees.load_data(directory, loader="snapshot")
+    pairs = random_pairs(count)
+
+    expected = None
+    for name, strategy in SEARCHES.items():
+        elapsed, lengths = time_search(strategy, pairs)
+        if expected is None:
+            expected = lengths
+        agrees = "" if lengths == expected else " (path lengths differ!)"
+        print(f"{name:>40}: {elapsed * 1000:.2f} ms/query{agrees}")
+
+
+BENCHMARKS = {
+    "frontier": frontier,
+    "load": load,
+    "search": search,
+}
+
+
+def main():
+    if len(sys.argv) < 2 or sys.argv[1] not in BENCHMARKS:
+        sys.exit(f"Usage: python benchmark.py [{'|'.join(BENCHMARKS)}] [args...]")
+    BENCHMARKS[sys.argv[1]](sys.argv[2:])
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,438 @@
+"""
+Compact, integer-indexed representation of the degrees graph.
+
+People and movies are interned to dense ints (in sorted IMDb id order, so
+an id is found by binary search) and the person->movie and movie->person
+adjacency is stored CSR-style: an offsets array and an index array per
+direction. Mapping adapters expose the graph as the `people`, `movies` and
+`names` dicts that degrees.py expects.
+
+A parsed graph can be written to a versioned binary snapshot next to the
+CSV files and memory-mapped on later runs, so startup does no parsing.
+"""
+
+import bisect
+import csv
+import json
+import mmap
+import os
+import struct
+from array import array
+from collections.abc import Mapping
+from itertools import accumulate
+
+# Typecode for dense indices and offsets
+INDEX = "i"
+
+# Snapshot file layout: magic, format version, header length, JSON header,
+# then each section 8-byte aligned at the offset the header records
+SNAPSHOT = "degrees.snapshot"
+SNAPSHOT_MAGIC = b"DEGSNAP\0"
+SNAPSHOT_VERSION = 2
+SNAPSHOT_PREAMBLE = struct.Struct("<8sII")
+SOURCES = ["people.csv", "movies.csv", "stars.csv"]
+
+
+class StringTable():
+    """
+    Immutable sequence of strings stored as a single UTF-8 blob
+    plus an array of offsets into it.
+    """
+
+    def __init__(self, offsets, blob):
+        self.offsets = offsets
+        self.blob = blob
+
+    @classmethod
+    def from_strings(cls, strings):
+        chunks = [string.encode("utf-8") for string in strings]
+        offsets = array("q", accumulate(map(len, chunks), initial=0))
+        return cls(offsets, b"".join(chunks))
+
+    def __len__(self):
+        return len(self.offsets) - 1
+
+    def __getitem__(self, i):
+        if not 0 <= i < len(self):
+            raise IndexError("string table index out of range")
+        return str(self.blob[self.offsets[i]:self.offsets[i + 1]], "utf-8")
+
+    def find(self, string):
+        """
+        Returns the index of string in a sorted table, or None.
+        """
+        i = bisect.bisect_left(self, string)
+        if i < len(self) and self[i] == string:
+            return i
+        return None
+
+
+def csr(keys, rows, columns):
+    """
+    Builds (offsets, indices) arrays for a sorted, duplicate-free list of
+    edges encoded as row * columns + column, with rows in range(rows).
+    """
+    offsets = array(INDEX, (bisect.bisect_left(keys, row * columns)
+                            for row in range(rows + 1)))
+    indices = array(INDEX, (key % columns for key in keys))
+    return offsets, indices
+
+
+def read_csv(path, *fields):
+    """
+    Yields tuples of the named fields from each row of a CSV file.
+    """
+    with open(path, encoding="utf-8") as f:
+        reader = csv.reader(f)
+        header = next(reader)
+        columns = [header.index(field) for field in fields]
+        for row in reader:
+            yield tuple(row[column] for column in columns)
+
+
+class CompactGraph():
+    """
+    People, movies and the star relation between them, indexed by dense ints.
+    """
+
+    def __init__(self, person_ids, person_names, person_births,
+                 movie_ids, movie_titles, movie_years,
+                 person_offsets, person_movies, movie_offsets, movie_stars,
+                 name_keys, name_people):
+        self.person_ids = person_ids
+        self.person_names = person_names
+        self.person_births = person_births
+        self.movie_ids = movie_ids
+        self.movie_titles = movie_titles
+        self.movie_years = movie_years
+        self.person_offsets = person_offsets
+        self.person_movies = person_movies
+        self.movie_offsets = movie_offsets
+        self.movie_stars = movie_stars
+        # Lowercased names, sorted, with the person index for each entry
+        self.name_keys = name_keys
+        self.name_people = name_people
+
+    @classmethod
+    def from_csv(cls, directory):
+        """
+        Parses people.csv, movies.csv and stars.csv in directory.
+        """
+        people = sorted(read_csv(f"{directory}/people.csv", "id", "name", "birth"))
+        movies = sorted(read_csv(f"{directory}/movies.csv", "id", "title", "year"))
+        num_people, num_movies = len(people), len(movies)
+
+        # Only needed while parsing stars; the graph itself uses bisection
+        person_index = {person[0]: i for i, person in enumerate(people)}
+        movie_index = {movie[0]: i for i, movie in enumerate(movies)}
+
+        # Each star edge encoded as one int, which dedups and sorts cheaply
+        stars = set()
+        for person_id, movie_id in read_csv(f"{directory}/stars.csv", "person_id", "movie_id"):
+            try:
+                stars.add(person_index[person_id] * num_movies + movie_index[movie_id])
+            except KeyError:
+                pass
+        by_person = sorted(stars)
+        by_movie = sorted((key % num_movies) * num_people + key // num_movies
+                          for key in by_person)
+        del stars, person_index, movie_index
+
+        person_offsets, person_movies = csr(by_person, num_people, num_movies)
+        movie_offsets, movie_stars = csr(by_movie, num_movies, num_people)
+
+        names = sorted((person[1].lower(), i) for i, person in enumerate(people))
+
+        return cls(
+            person_ids=StringTable.from_strings(person[0] for person in people),
+            person_names=StringTable.from_strings(person[1] for person in people),
+            person_births=StringTable.from_strings(person[2] for person in people),
+            movie_ids=StringTable.from_strings(movie[0] for movie in movies),
+            movie_titles=StringTable.from_strings(movie[1] for movie in movies),
+            movie_years=StringTable.from_strings(movie[2] for movie in movies),
+            person_offsets=person_offsets,
+            person_movies=person_movies,
+            movie_offsets=movie_offsets,
+            movie_stars=movie_stars,
+            name_keys=StringTable.from_strings(name for name, _ in names),
+            name_people=array(INDEX, (i for _, i in names)),
+        )
+
+    STRING_TABLES = ["person_ids", "person_names", "person_births",
+                     "movie_ids", "movie_titles", "movie_years", "name_keys"]
+    ARRAYS = ["person_offsets", "person_movies", "movie_offsets", "movie_stars",
+              "name_people"]
+
+    def sections(self):
+        """
+        Yields (name, typecode, buffer) for every array backing the graph.
+        """
+        for field in self.STRING_TABLES:
+            table = getattr(self, field)
+            yield f"{field}.offsets", "q", table.offsets
+            yield f"{field}.blob", "B", table.blob
+        for field in self.ARRAYS:
+            yield field, INDEX, getattr(self, field)
+
+    @classmethod
+    def from_sections(cls, sections):
+        """
+        Rebuilds a graph from a dict of section name to buffer.
+        """
+        fields = {}
+        for field in cls.STRING_TABLES:
+            fields[field] = StringTable(sections[f"{field}.offsets"],
+                                        sections[f"{field}.blob"])
+        for field in cls.ARRAYS:
+            fields[field] = sections[field]
+        return cls(**fields)
+
+    @property
+    def num_people(self):
+        return len(self.person_ids)
+
+    @property
+    def num_movies(self):
+        return len(self.movie_ids)
+
+    def movies_of(self, person):
+        """
+        Returns the movie indices a person index starred in.
+        """
+        return self.person_movies[self.person_offsets[person]:self.person_offsets[person + 1]]
+
+    def stars_of(self, movie):
+        """
+        Returns the person indices who starred in a movie index.
+        """
+        return self.movie_stars[self.movie_offsets[movie]:self.movie_offsets[movie + 1]]
+
+    def people_named(self, key):
+        """
+        Returns the person indices whose lowercased name is key.
+        """
+        start = bisect.bisect_left(self.name_keys, key)
+        end = start
+        while end < len(self.name_keys) and self.name_keys[end] == key:
+            end += 1
+        return self.name_people[start:end]
+
+
+def source_stamps(directory):
+    """
+    Returns {filename: [size, mtime_ns]} for the CSV files in directory.
+    """
+    stamps = {}
+    for filename in SOURCES:
+        stat = os.stat(os.path.join(directory, filename))
+        stamps[filename] = [stat.st_size, stat.st_mtime_ns]
+    return stamps
+
+
+def aligned(offset):
+    """
+    Rounds offset up to the next multiple of 8.
+    """
+    return -(-offset // 8) * 8
+
+
+def save_snapshot(data, path, sources):
+    """
+    Writes data (a CompactGraph or anything else with sections() and
+    from_sections()) to a binary snapshot at path, recording the source
+    file stamps it was built from. The file is replaced atomically.
+    """
+    sections = []
+    buffers = []
+    end = 0
+    for name, typecode, buffer in data.sections():
+        view = memoryview(buffer).cast("B")
+        sections.append([name, typecode, end, view.nbytes])
+        buffers.append(view)
+        end = aligned(end + view.nbytes)
+    header = json.dumps({
+        "kind": type(data).__name__,
+        "sources": sources,
+        "sections": sections,
+    }).encode("utf-8")
+    start = aligned(SNAPSHOT_PREAMBLE.size + len(header))
+
+    temporary = f"{path}.tmp"
+    with open(temporary, "wb") as f:
+        f.write(SNAPSHOT_PREAMBLE.pack(SNAPSHOT_MAGIC, SNAPSHOT_VERSION, len(header)))
+        f.write(header)
+        for (_, _, offset, _), view in zip(sections, buffers):
+            f.seek(start + offset)
+            f.write(view)
+        f.truncate(start + end)
+    os.replace(temporary, path)
+
+
+def load_snapshot(path, sources, kind=None):
+    """
+    Memory-maps the snapshot at path as an instance of kind (by default
+    CompactGraph). Returns None if it is missing, truncated or corrupt,
+    from another format version or kind, or was built from different
+    sources.
+    """
+    kind = kind or CompactGraph
+    try:
+        with open(path, "rb") as f:
+            buffer = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    except (OSError, ValueError):
+        return None
+
+    try:
+        magic, version, length = SNAPSHOT_PREAMBLE.unpack_from(buffer)
+        if magic != SNAPSHOT_MAGIC or version != SNAPSHOT_VERSION:
+            return None
+        if len(buffer) < SNAPSHOT_PREAMBLE.size + length:
+            return None
+        header = json.loads(buffer[SNAPSHOT_PREAMBLE.size:SNAPSHOT_PREAMBLE.size + length])
+        if header["kind"] != kind.__name__ or header["sources"] != sources:
+            return None
+        start = aligned(SNAPSHOT_PREAMBLE.size + length)
+        layout = [(name, typecode, int(offset), int(size))
+                  for name, typecode, offset, size in header["sections"]]
+    except (struct.error, ValueError, KeyError, TypeError):
+        return None
+
+    # A snapshot cut off inside its data would otherwise load silently
+    if any(offset < 0 or size < 0 or start + offset + size > len(buffer)
+           for _, _, offset, size in layout):
+        return None
+
+    view = memoryview(buffer)
+    try:
+        sections = {
+            name: view[start + offset:start + offset + size].cast(typecode)
+            for name, typecode, offset, size in layout
+        }
+        data = kind.from_sections(sections)
+    except (ValueError, TypeError, KeyError):
+        return None
+    # Keep the mapping alive for as long as the data is
+    data.buffer = buffer
+    return data
+
+
+def cached(directory, filename, kind, build):
+    """
+    Returns the kind instance snapshotted at filename in directory when
+    that is up to date with the CSV files, and otherwise calls build()
+    and snapshots its result.
+    """
+    sources = source_stamps(directory)
+    path = os.path.join(directory, filename)
+    try:
+        fresh = os.stat(path).st_mtime_ns >= max(stamp[1] for stamp in sources.values())
+    except OSError:
+        fresh = False
+    data = load_snapshot(path, sources, kind) if fresh else None
+    if data is None:
+        data = build()
+        try:
+            save_snapshot(data, path, sources)
+        except OSError:
+            pass
+    return data
+
+
+def load(directory):
+    """
+    Returns the CompactGraph for directory, memory-mapping its snapshot
+    when that is up to date with the CSV files and otherwise parsing the
+    CSV files and writing a fresh snapshot.
+    """
+    return cached(directory, SNAPSHOT, CompactGraph,
+                  lambda: CompactGraph.from_csv(directory))
+
+
+class PeopleView(Mapping):
+    """
+    Read-only `people` dict backed by a CompactGraph.
+    """
+
+    def __init__(self, graph):
+        self.graph = graph
+
+    def __getitem__(self, person_id):
+        graph = self.graph
+        person = graph.person_ids.find(person_id)
+        if person is None:
+            raise KeyError(person_id)
+        return {
+            "name": graph.person_names[person],
+            "birth": graph.person_births[person],
+            "movies": {graph.movie_ids[movie] for movie in graph.movies_of(person)},
+        }
+
+    def __contains__(self, person_id):
+        return self.graph.person_ids.find(person_id) is not None
+
+    def __iter__(self):
+        return iter(self.graph.person_ids)
+
+    def __len__(self):
+        return self.graph.num_people
+
+
+class MoviesView(Mapping):
+    """
+    Read-only `movies` dict backed by a CompactGraph.
+    """
+
+    def __init__(self, graph):
+        self.graph = graph
+
+    def __getitem__(self, movie_id):
+        graph = self.graph
+        movie = graph.movie_ids.find(movie_id)
+        if movie is None:
+            raise KeyError(movie_id)
+        return {
+            "title": graph.movie_titles[movie],
+            "year": graph.movie_years[movie],
+            "stars": {graph.person_ids[person] for person in graph.stars_of(movie)},
+        }
+
+    def __contains__(self, movie_id):
+        return self.graph.movie_ids.find(movie_id) is not None
+
+    def __iter__(self):
+        return iter(self.graph.movie_ids)
+
+    def __len__(self):
+        return self.graph.num_movies
+
+
+class NamesView(Mapping):
+    """
+    Read-only `names` dict backed by a CompactGraph.
+    """
+
+    def __init__(self, graph):
+        self.graph = graph
+
+    def __getitem__(self, name):
+        people = self.graph.people_named(name)
+        if not people:
+            raise KeyError(name)
+        return {self.graph.person_ids[person] for person in people}
+
+    def __iter__(self):
+        previous = None
+        for name in self.graph.name_keys:
+            if name != previous:
+                yield name
+            previous = name
+
+    def __len__(self):
+        return sum(1 for _ in self)
+
+
+def views(graph):
+    """
+    Returns (names, people, movies) mappings over graph.
+    """
+    return NamesView(graph), PeopleView(graph), MoviesView(graph)
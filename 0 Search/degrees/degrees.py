@@ -1,7 +1,12 @@
+import argparse
 import csv
+import functools
+import json
 import sys
 
-from util import Node, StackFrontier, QueueFrontier
+import compact
+import nameindex
+from util import Node, StackFrontier, QueueFrontier, SearchStats, instrumented
 
 # Maps names to a set of corresponding person_ids
 names = {}
@@ -12,14 +17,35 @@ people = {}
 # Maps movie_ids to a dictionary of: title, year, stars (a set of person_ids)
 movies = {}
 
+# Prefix and fuzzy index over the keys of names, built on first use
+name_index = None
+
 import pprint
 pp = pprint.PrettyPrinter(indent=2)
 
 
-def load_data(directory):
+def load_data(directory, loader="dicts"):
     """
     Load data from CSV files into memory.
+
+    With loader="compact" the data is held in an integer-indexed
+    compact.CompactGraph and names, people and movies become read-only
+    mappings over it. loader="snapshot" does the same, but memory-maps a
+    binary snapshot of the graph, rewriting it first if any CSV changed.
     """
+    global names, people, movies, name_index
+    name_index = None
+    if loader == "compact":
+        names, people, movies = compact.views(compact.CompactGraph.from_csv(directory))
+        return
+    if loader == "snapshot":
+        graph = compact.load(directory)
+        names, people, movies = compact.views(graph)
+        name_index = nameindex.load(directory, graph.name_keys)
+        return
+    if not isinstance(people, dict):
+        names, people, movies = {}, {}, {}
+
     # Load people
     with open(f"{directory}/people.csv", encoding="utf-8") as f:
         reader = csv.DictReader(f)
@@ -58,16 +84,48 @@ def load_data(directory):
     # print('movies = ');    pp.pprint(movies)
 
 
+def parse_args(argv=None):
+    """
+    Parses command-line arguments.
+    """
+    parser = argparse.ArgumentParser(description="Degrees of separation between actors.")
+    parser.add_argument("directory", nargs="?", default="large",
+                        help="directory containing people.csv, movies.csv and stars.csv")
+    parser.add_argument("--unidirectional", action="store_true",
+                        help="use the one-sided BFS from the source instead of the bidirectional search")
+    parser.add_argument("--loader", choices=["snapshot", "compact", "dicts"], default="snapshot",
+                        help="how to hold the graph in memory (default: memory-mapped snapshot)")
+    parser.add_argument("--batch", metavar="FILE",
+                        help="answer tab-separated name pairs from FILE ('-' for stdin) as JSONL")
+    parser.add_argument("--output", metavar="FILE", default="-",
+                        help="where to write batch results (default: stdout)")
+    parser.add_argument("--stats", action="store_true",
+                        help="report search statistics (to stderr, or per record in batch mode)")
+    args = parser.parse_args(argv)
+    if args.batch and args.unidirectional:
+        parser.error("--unidirectional cannot be used with --batch, "
+                     "which answers each source with one breadth-first tree")
+    return args
+
+
 def main():
-    if len(sys.argv) > 2:
-        sys.exit("Usage: python degrees.py [directory]")
-    directory = sys.argv[1] if len(sys.argv) == 2 else "large"
+    args = parse_args()
+    directory = args.directory
+
+    # Keep stdout clean for JSONL in batch mode
+    log = sys.stderr if args.batch else sys.stdout
 
     # Load data from files into memory
-    print("Loading data...")
-    load_data(directory)
-    print("Data loaded.")
+    print("Loading data...", file=log)
+    load_data(directory, loader=args.loader)
+    print("Data loaded.", file=log)
 
+    if args.batch:
+        with open_stream(args.batch, "r") as pairs, open_stream(args.output, "w") as output:
+            run_batch(pairs, output, with_stats=args.stats)
+        return
+
+    enable_completion()
     source = person_id_for_name(input("Name: "))
     if source is None:
         sys.exit("Person not found.")
@@ -75,7 +133,10 @@ def main():
     if target is None:
         sys.exit("Person not found.")
 
-    path = shortest_path(source, target)
+    stats = SearchStats() if args.stats else None
+    path = shortest_path(source, target, bidirectional=not args.unidirectional, stats=stats)
+    if stats is not None:
+        print(json.dumps(stats.as_dict()), file=sys.stderr)
 
     if path is None:
         print("Not connected.")
@@ -90,20 +151,144 @@ def main():
             print(f"{i + 1}: {person1} and {person2} starred in {movie}")
 
 
-def shortest_path(source, target):
+def open_stream(filename, mode):
+    """
+    Opens filename, or stdin/stdout for "-", as a text stream,
+    without newline translation when reading so csv can parse it.
+    """
+    if filename == "-":
+        stream = sys.stdin if "r" in mode else sys.stdout
+        filename = stream.fileno()
+    return open(filename, mode, encoding="utf-8", newline="" if "r" in mode else None,
+                closefd=not isinstance(filename, int))
+
+
+def run_batch(pairs, output, with_stats=False):
+    """
+    Answers every tab-separated (source name, target name) line of pairs,
+    writing one JSON object per line to output in input order.
+
+    Queries are grouped by source so a single BFS tree from each source
+    answers all of its targets. With with_stats, each record also carries
+    the SearchStats of the BFS tree that answered it.
+    """
+    queries = [row for row in csv.reader(pairs, delimiter="\t") if row]
+    results = [None] * len(queries)
+    by_source = {}
+
+    for i, row in enumerate(queries):
+        if len(row) != 2:
+            results[i] = {"line": i + 1, "error": "expected two tab-separated names"}
+            continue
+        source_name, target_name = row
+        result = {"line": i + 1, "source": source_name, "target": target_name}
+        results[i] = result
+        for key, name in [("source_id", source_name), ("target_id", target_name)]:
+            person_ids = sorted(names.get(name.lower(), set()))
+            if len(person_ids) == 1:
+                result[key] = person_ids[0]
+            else:
+                result["error"] = "ambiguous name" if person_ids else "person not found"
+                result["candidates"] = person_ids
+                result["name"] = name
+                break
+        else:
+            by_source.setdefault(result["source_id"], []).append(result)
+
+    for source, group in by_source.items():
+        stats = SearchStats() if with_stats else None
+        tree = bfs_tree(source, {result["target_id"] for result in group}, stats=stats)
+        for result in group:
+            path = path_from_tree(tree, result["target_id"])
+            result["degrees"] = None if path is None else len(path)
+            result["path"] = path
+            if stats is not None:
+                result["stats"] = stats.as_dict()
+
+    for result in results:
+        output.write(json.dumps(result) + "\n")
+
+
+@instrumented
+def bfs_tree(source, targets=None, *, stats=None):
+    """
+    Breadth-first search from source, returning a dict mapping each
+    reached person_id to its (movie_id, parent person_id) in the BFS tree.
+
+    If targets is given, the search stops once all of them are reached.
+    If stats is a SearchStats, it is filled in for this search.
+    """
+    tree = {source: None}
+    remaining = set(targets or ()) - {source}
+    frontier = [source]
+    scanned = set()
+    neighbors = unscanned_neighbors
+    if stats is not None:
+        neighbors = stats.timed(neighbors)
+    while frontier and (remaining or targets is None):
+        next_frontier = []
+        if stats is not None:
+            stats.frontier(len(frontier))
+            stats.nodes_expanded += len(frontier)
+        for person_id in frontier:
+            for movie_id, neighbor_id in neighbors(person_id, scanned):
+                if neighbor_id not in tree:
+                    tree[neighbor_id] = (movie_id, person_id)
+                    next_frontier.append(neighbor_id)
+                    remaining.discard(neighbor_id)
+        frontier = next_frontier
+    return tree
+
+
+def path_from_tree(tree, target):
+    """
+    Returns the (movie_id, person_id) path from the root of a BFS tree
+    to target, or None if target was not reached.
+    """
+    if target not in tree:
+        return None
+    path = []
+    while tree[target] is not None:
+        movie_id, parent_id = tree[target]
+        path.append((movie_id, target))
+        target = parent_id
+    path.reverse()
+    return path
+
+
+@instrumented
+def shortest_path(source, target, bidirectional=True, movie_nodes=True, *, stats=None):
     """
     Returns the shortest list of (movie_id, person_id) pairs
     that connect the source to the target.
 
     If no possible path, returns None.
+
+    By default the search grows frontiers from both ends and stops when
+    they meet; pass bidirectional=False for the one-sided BFS from source.
+    With movie_nodes the bidirectional search treats movies as
+    intermediate nodes and scans each movie's cast at most once per side.
+
+    If stats is a SearchStats, it is filled in for this search.
     """
+    if bidirectional:
+        return bidirectional_path(source, target, movie_nodes, stats)
+    return unidirectional_path(source, target, stats)
+
 
-    # Keep track of number of states explored
-    num_explored = 0
+def unidirectional_path(source, target, stats=None):
+    """
+    Breadth-first search from source only, returning the same
+    (movie_id, person_id) path format as shortest_path.
+
+    stats, if given, must already be started (see shortest_path).
+    """
+    neighbors = neighbors_for_person
+    if stats is not None:
+        neighbors = stats.timed(neighbors)
 
     # Initialize frontier to just the source person
-    movie = list(people[source]['movies'])[0]
-    start = Node(state=source, parent=None, action=movie)       #;print(f'{start.state=}\t{start.parent=}\t{start.action=}\t')
+    start = Node(state=source, parent=None, action=None)
     frontier = QueueFrontier()
     frontier.add(start)
 
@@ -112,13 +297,16 @@ def shortest_path(source, target):
 
     # Keep looping until solution found
     while True:
-        print(f'{num_explored=}')
         # If nothing left in frontier, then no path
         if frontier.empty(): return None
 
+        # Keep track of number of states explored
+        if stats is not None:
+            stats.frontier(len(frontier))
+            stats.nodes_expanded += 1
+
         # Choose a node from the frontier
         node = frontier.remove()
-        num_explored += 1
 
         # If node is the goal, then we have a solution
         if node.state == target:
@@ -133,12 +321,111 @@ def shortest_path(source, target):
         explored.add(node.state)
 
         # Add neighbors to frontier
-        for movie_id, person_id in neighbors_for_person(node.state):
+        for movie_id, person_id in neighbors(node.state):
             if not frontier.contains_state(person_id) and person_id not in explored:
                 child = Node(state=person_id, parent=node, action=movie_id)
                 frontier.add(child)
 
 
+def bidirectional_path(source, target, movie_nodes=True, stats=None):
+    """
+    Breadth-first search from both source and target at once, always
+    expanding a whole layer of the smaller frontier, until they meet.
+
+    Returns the same (movie_id, person_id) path format as shortest_path.
+    stats, if given, must already be started (see shortest_path).
+    """
+    if source == target:
+        return []
+
+    # Each side maps a reached person to (movie_id, previous person, depth),
+    # where previous person is one step closer to that side's origin
+    forward = {source: (None, None, 0)}
+    backward = {target: (None, None, 0)}
+    forward_frontier = [source]
+    backward_frontier = [target]
+
+    # Movies whose cast each side has already scanned
+    forward_scanned = set() if movie_nodes else None
+    backward_scanned = set() if movie_nodes else None
+
+    while forward_frontier and backward_frontier:
+        if stats is not None:
+            stats.frontier(len(forward_frontier) + len(backward_frontier))
+        if len(forward_frontier) <= len(backward_frontier):
+            forward_frontier, meeting = expand_layer(
+                forward_frontier, forward, backward, forward_scanned, stats
+            )
+        else:
+            backward_frontier, meeting = expand_layer(
+                backward_frontier, backward, forward, backward_scanned, stats
+            )
+
+        if meeting is not None:
+            return join_paths(meeting, forward, backward)
+
+    return None
+
+
+def expand_layer(frontier, reached, other, scanned=None, stats=None):
+    """
+    Expands every person in frontier by one hop, recording new people in
+    reached. Returns the next frontier and the person where the two
+    searches meet on the shortest total path (or None if they have not).
+
+    If scanned is a set of movie_ids, neighbors come from
+    unscanned_neighbors instead of neighbors_for_person.
+    """
+    if scanned is None:
+        neighbors = neighbors_for_person
+    else:
+        neighbors = functools.partial(unscanned_neighbors, scanned=scanned)
+    if stats is not None:
+        neighbors = stats.timed(neighbors)
+        stats.nodes_expanded += len(frontier)
+
+    next_frontier = []
+    meeting = None
+    best = None
+    for person_id in frontier:
+        depth = reached[person_id][2] + 1
+        for movie_id, neighbor_id in neighbors(person_id):
+            if neighbor_id in reached:
+                continue
+            reached[neighbor_id] = (movie_id, person_id, depth)
+            next_frontier.append(neighbor_id)
+
+            # Finish the layer so the meeting with the shallowest
+            # counterpart on the other side wins
+            if neighbor_id in other:
+                total = depth + other[neighbor_id][2]
+                if best is None or total < best:
+                    best = total
+                    meeting = neighbor_id
+    return next_frontier, meeting
+
+
+def join_paths(meeting, forward, backward):
+    """
+    Stitches the forward and backward search trees together at meeting
+    into a list of (movie_id, person_id) pairs from source to target.
+    """
+    path = []
+    person_id = meeting
+    while forward[person_id][1] is not None:
+        movie_id, previous_id, _ = forward[person_id]
+        path.append((movie_id, person_id))
+        person_id = previous_id
+    path.reverse()
+
+    person_id = meeting
+    while backward[person_id][1] is not None:
+        movie_id, next_id, _ = backward[person_id]
+        path.append((movie_id, next_id))
+        person_id = next_id
+    return path
+
+
 def person_id_for_name(name):
     """
     Returns the IMDB id for a person's name,
@@ -146,6 +433,18 @@ def person_id_for_name(name):
     """
     person_ids = list(names.get(name.lower(), set()))
     if len(person_ids) == 0:
+        suggestions = get_name_index().suggest(name)
+        if not suggestions:
+            return None
+        print(f"'{name}' not found. Did you mean:")
+        for i, suggestion in enumerate(suggestions, start=1):
+            person = people[next(iter(names[suggestion]))]
+            print(f"{i}: {person['name']}")
+        choice = input("Number or name (blank to give up): ").strip()
+        if choice.isdigit() and 1 <= int(choice) <= len(suggestions):
+            return person_id_for_name(suggestions[int(choice) - 1])
+        elif choice:
+            return person_id_for_name(choice)
         return None
     elif len(person_ids) > 1:
         print(f"Which '{name}'?")
@@ -165,6 +464,35 @@ def person_id_for_name(name):
         return person_ids[0]
 
 
+def get_name_index():
+    """
+    Returns the name index, building it from names if not loaded yet.
+    """
+    global name_index
+    if name_index is None:
+        name_index = nameindex.NameIndex.from_names(names)
+    return name_index
+
+
+def enable_completion():
+    """
+    Tab-completes names at the input() prompt, where readline is available.
+    The name index is built on the first completion, not up front.
+    """
+    try:
+        import readline
+    except ImportError:
+        return
+
+    def complete(text, state):
+        matches = get_name_index().prefix(text, limit=state + 1)
+        return matches[state] if state < len(matches) else None
+
+    readline.set_completer_delims("")
+    readline.set_completer(complete)
+    readline.parse_and_bind("tab: complete")
+
+
 def neighbors_for_person(person_id):
     """
     Returns (movie_id, person_id) pairs for people
@@ -178,5 +506,20 @@ def neighbors_for_person(person_id):
     return neighbors
 
 
+def unscanned_neighbors(person_id, scanned):
+    """
+    Yields (movie_id, person_id) pairs for people who starred with a given
+    person, treating movies as intermediate search nodes: movies already in
+    scanned are skipped, and the rest are added to it once their cast has
+    been yielded. The same co-star may be yielded once per shared movie.
+    """
+    for movie_id in people[person_id]["movies"]:
+        if movie_id in scanned:
+            continue
+        for star_id in movies[movie_id]["stars"]:
+            yield movie_id, star_id
+        scanned.add(movie_id)
+
+
 if __name__ == "__main__":
     main()
@@ -0,0 +1,203 @@
+"""
+Prefix completion and typo-tolerant lookup of lowercased people names.
+
+The index holds the distinct names sorted (for prefix search by bisection)
+and a trigram inverted index stored CSR-style, like the graph itself.
+Fuzzy candidates are names sharing enough trigrams with the query, and
+are then checked with a bounded edit distance. Queries too short for
+trigrams to rule anything out fall back to scanning the names of nearby
+lengths, which are kept grouped by length for that purpose. The index is snapshotted
+next to the graph snapshot with the same invalidation rules.
+"""
+
+import bisect
+from array import array
+from itertools import accumulate
+
+import compact
+from compact import INDEX, StringTable
+
+NAME_INDEX = "names.index"
+
+# Length of the n-grams used to find fuzzy candidates
+GRAM = 3
+
+# Pads names so their first and last characters get their own n-grams
+PAD = "\x00" * (GRAM - 1)
+
+
+def grams(name):
+    """
+    Returns the set of padded n-grams of name.
+    """
+    padded = f"{PAD}{name}{PAD}"
+    return {padded[i:i + GRAM] for i in range(len(padded) - GRAM + 1)}
+
+
+def edit_distance(a, b, bound):
+    """
+    Returns the Levenshtein distance between a and b,
+    or bound + 1 if it is greater than bound.
+    """
+    if abs(len(a) - len(b)) > bound:
+        return bound + 1
+    previous = list(range(len(b) + 1))
+    for i, char_a in enumerate(a, start=1):
+        current = [i]
+        for j, char_b in enumerate(b, start=1):
+            current.append(min(previous[j] + 1,
+                               current[j - 1] + 1,
+                               previous[j - 1] + (char_a != char_b)))
+        if min(current) > bound:
+            return bound + 1
+        previous = current
+    return min(previous[-1], bound + 1)
+
+
+class NameIndex():
+    """
+    Sorted distinct names with a trigram index over them.
+    """
+
+    def __init__(self, keys, grams, gram_offsets, gram_names, length_offsets, length_names):
+        self.keys = keys
+        self.grams = grams
+        self.gram_offsets = gram_offsets
+        self.gram_names = gram_names
+        # Names of length n are length_names[length_offsets[n]:length_offsets[n + 1]]
+        self.length_offsets = length_offsets
+        self.length_names = length_names
+
+    @classmethod
+    def from_names(cls, names):
+        """
+        Builds the index from an iterable of lowercased names,
+        which may contain duplicates.
+        """
+        keys = sorted(set(names))
+        postings = {}
+        for i, key in enumerate(keys):
+            for gram in grams(key):
+                postings.setdefault(gram, []).append(i)
+        gram_keys = sorted(postings)
+        gram_names = array(INDEX)
+        for gram in gram_keys:
+            gram_names.extend(postings[gram])
+        longest = max(map(len, keys), default=0)
+        counts = [0] * (longest + 1)
+        for key in keys:
+            counts[len(key)] += 1
+        length_names = array(INDEX, sorted(range(len(keys)), key=lambda i: len(keys[i])))
+        return cls(
+            keys=StringTable.from_strings(keys),
+            grams=StringTable.from_strings(gram_keys),
+            gram_offsets=array(INDEX, accumulate((len(postings[gram]) for gram in gram_keys),
+                                                 initial=0)),
+            gram_names=gram_names,
+            length_offsets=array(INDEX, accumulate(counts, initial=0)),
+            length_names=length_names,
+        )
+
+    def sections(self):
+        """
+        Yields (name, typecode, buffer) for every array backing the index.
+        """
+        for field in ["keys", "grams"]:
+            table = getattr(self, field)
+            yield f"{field}.offsets", "q", table.offsets
+            yield f"{field}.blob", "B", table.blob
+        yield "gram_offsets", INDEX, self.gram_offsets
+        yield "gram_names", INDEX, self.gram_names
+        yield "length_offsets", INDEX, self.length_offsets
+        yield "length_names", INDEX, self.length_names
+
+    @classmethod
+    def from_sections(cls, sections):
+        """
+        Rebuilds an index from a dict of section name to buffer.
+        """
+        return cls(
+            keys=StringTable(sections["keys.offsets"], sections["keys.blob"]),
+            grams=StringTable(sections["grams.offsets"], sections["grams.blob"]),
+            gram_offsets=sections["gram_offsets"],
+            gram_names=sections["gram_names"],
+            length_offsets=sections["length_offsets"],
+            length_names=sections["length_names"],
+        )
+
+    def __len__(self):
+        return len(self.keys)
+
+    def prefix(self, prefix, limit=10):
+        """
+        Returns up to limit names starting with prefix, in sorted order.
+        """
+        prefix = prefix.lower()
+        matches = []
+        i = bisect.bisect_left(self.keys, prefix)
+        while i < len(self.keys) and len(matches) < limit:
+            key = self.keys[i]
+            if not key.startswith(prefix):
+                break
+            matches.append(key)
+            i += 1
+        return matches
+
+    def suggest(self, name, max_distance=2, limit=10):
+        """
+        Returns up to limit names within max_distance edits of name,
+        closest first.
+        """
+        name = name.lower()
+        query = grams(name)
+
+        # Each edit destroys at most GRAM of the query's n-grams, so a match
+        # keeps at least `threshold` of them and must therefore contain one
+        # of the len(query) - threshold + 1 rarest
+        threshold = len(query) - max_distance * GRAM
+        if threshold <= 0:
+            # Too short for the n-grams to rule anything out
+            candidates = self.lengths_near(len(name), max_distance)
+        else:
+            postings = []
+            for gram in query:
+                g = self.grams.find(gram)
+                if g is None:
+                    postings.append(())
+                else:
+                    postings.append(
+                        self.gram_names[self.gram_offsets[g]:self.gram_offsets[g + 1]])
+            postings.sort(key=len)
+            candidates = set()
+            for posting in postings[:len(query) - threshold + 1]:
+                candidates.update(posting)
+
+        suggestions = []
+        for i in candidates:
+            key = self.keys[i]
+            if threshold > 0 and len(query & grams(key)) < threshold:
+                continue
+            distance = edit_distance(name, key, max_distance)
+            if distance <= max_distance:
+                suggestions.append((distance, key))
+        suggestions.sort()
+        return [key for _, key in suggestions[:limit]]
+
+    def lengths_near(self, length, distance):
+        """
+        Returns the indices of names whose length is within distance of length.
+        """
+        last = len(self.length_offsets) - 1
+        low = min(max(0, length - distance), last)
+        high = min(length + distance + 1, last)
+        return self.length_names[self.length_offsets[low]:self.length_offsets[high]]
+
+
+def load(directory, names):
+    """
+    Returns the NameIndex for the dataset in directory, memory-mapping its
+    snapshot when that is up to date with the CSV files and otherwise
+    building it from the lowercased names and writing a fresh snapshot.
+    """
+    return compact.cached(directory, NAME_INDEX, NameIndex,
+                          lambda: NameIndex.from_names(names))
@@ -0,0 +1,169 @@
+"""
+Degrees-of-separation statistics over the whole people graph.
+
+Runs a breadth-first search from many sampled people in a process pool.
+Every worker reads one shared-memory copy of the compact CSR adjacency
+instead of receiving its own pickled copy of the graph.
+
+Usage: python separation.py [directory] [--samples N] [--workers N] [--json FILE]
+"""
+
+import argparse
+import json
+import os
+import random
+import sys
+from collections import Counter
+from multiprocessing import Pool, shared_memory
+
+import compact
+
+# Adjacency arrays copied into shared memory, in this order
+ADJACENCY = ["person_offsets", "person_movies", "movie_offsets", "movie_stars"]
+
+# Set in each worker by attach()
+adjacency = None
+
+
+def separation_histogram(source, person_offsets, person_movies, movie_offsets, movie_stars):
+    """
+    Breadth-first search from the person index source over the CSR arrays.
+
+    Returns a list whose entry d is the number of people at exactly d
+    degrees of separation from source, so its length minus one is the
+    eccentricity of source within its connected component.
+
+    This is neighbors_for_person on integer indices, with each movie's cast
+    scanned only the first time any of its stars is expanded.
+    """
+    reached = bytearray(len(person_offsets) - 1)
+    scanned = bytearray(len(movie_offsets) - 1)
+    reached[source] = 1
+    histogram = [1]
+    frontier = [source]
+    while frontier:
+        next_frontier = []
+        for person in frontier:
+            for movie in person_movies[person_offsets[person]:person_offsets[person + 1]]:
+                if scanned[movie]:
+                    continue
+                scanned[movie] = 1
+                for star in movie_stars[movie_offsets[movie]:movie_offsets[movie + 1]]:
+                    if not reached[star]:
+                        reached[star] = 1
+                        next_frontier.append(star)
+        if next_frontier:
+            histogram.append(len(next_frontier))
+        frontier = next_frontier
+    return histogram
+
+
+def share(graph):
+    """
+    Copies the adjacency arrays of graph into one shared memory block.
+
+    Returns the block and a layout of (typecode, offset, length) per array.
+    """
+    buffers = [memoryview(getattr(graph, name)).cast("B") for name in ADJACENCY]
+    block = shared_memory.SharedMemory(create=True, size=max(1, sum(b.nbytes for b in buffers)))
+    layout = []
+    offset = 0
+    for buffer in buffers:
+        block.buf[offset:offset + buffer.nbytes] = buffer
+        layout.append((compact.INDEX, offset, buffer.nbytes))
+        offset += buffer.nbytes
+    return block, layout
+
+
+def attach(name, layout):
+    """
+    Pool initializer: maps the shared adjacency into this worker.
+    """
+    global adjacency
+    block = shared_memory.SharedMemory(name=name)
+    adjacency = [block.buf[offset:offset + size].cast(typecode)
+                 for typecode, offset, size in layout]
+    adjacency.append(block)
+
+
+def histograms(sources):
+    """
+    Pool task: returns (source, histogram) for each source index.
+    """
+    return [(source, separation_histogram(source, *adjacency[:4])) for source in sources]
+
+
+def separation_stats(graph, samples=1000, workers=None, seed=None, chunk=None):
+    """
+    Samples people from graph and runs a BFS from each in a process pool.
+
+    Returns a dict with the histogram of separation over all sampled
+    (source, reachable target) pairs, its mean, a diameter estimate
+    (the largest sampled eccentricity) and each sampled person's
+    eccentricity.
+    """
+    population = range(graph.num_people)
+    sources = population if samples >= len(population) else random.Random(seed).sample(population, samples)
+    workers = workers or os.cpu_count()
+    chunk = chunk or max(1, len(sources) // (workers * 4))
+    chunks = [sources[i:i + chunk] for i in range(0, len(sources), chunk)]
+
+    block, layout = share(graph)
+    try:
+        with Pool(workers, initializer=attach, initargs=(block.name, layout)) as pool:
+            results = [result for results in pool.imap_unordered(histograms, chunks)
+                       for result in results]
+    finally:
+        block.close()
+        block.unlink()
+
+    histogram = Counter()
+    eccentricity = {}
+    for source, counts in results:
+        for distance, count in enumerate(counts[1:], start=1):
+            histogram[distance] += count
+        eccentricity[graph.person_ids[source]] = len(counts) - 1
+
+    pairs = sum(histogram.values())
+    return {
+        "sources": len(results),
+        "pairs": pairs,
+        "histogram": dict(sorted(histogram.items())),
+        "mean": sum(d * n for d, n in histogram.items()) / pairs if pairs else None,
+        "diameter_estimate": max(eccentricity.values(), default=0),
+        "eccentricity": eccentricity,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Degrees of separation statistics.")
+    parser.add_argument("directory", nargs="?", default="large")
+    parser.add_argument("--samples", type=int, default=1000,
+                        help="number of sampled source people (default: 1000)")
+    parser.add_argument("--workers", type=int, default=None,
+                        help="worker processes (default: one per core)")
+    parser.add_argument("--seed", type=int, default=None)
+    parser.add_argument("--json", metavar="FILE",
+                        help="also write the statistics, including eccentricities, as JSON")
+    args = parser.parse_args()
+
+    print("Loading data...", file=sys.stderr)
+    graph = compact.load(args.directory)
+    print("Data loaded.", file=sys.stderr)
+
+    stats = separation_stats(graph, args.samples, args.workers, args.seed)
+
+    print(f"Sources: {stats['sources']}, reachable pairs: {stats['pairs']}")
+    for distance, count in stats["histogram"].items():
+        print(f"{distance:>3} degrees: {count}")
+    if stats["mean"] is not None:
+        print(f"Mean separation: {stats['mean']:.3f}")
+    print(f"Diameter estimate: {stats['diameter_estimate']}")
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(stats, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,91 @@
+import pytest
+
+import degrees
+from compact import *
+
+degrees.load_data("small")
+graph = CompactGraph.from_csv("small")
+
+
+@pytest.fixture
+def compact_degrees(monkeypatch):
+    names, people, movies = views(graph)
+    monkeypatch.setattr(degrees, "names", names)
+    monkeypatch.setattr(degrees, "people", people)
+    monkeypatch.setattr(degrees, "movies", movies)
+
+
+def test_string_table():
+    table = StringTable.from_strings(["Apollo 13", "Kevin Bacon", "Renée"])
+    assert len(table) == 3
+    assert list(table) == ["Apollo 13", "Kevin Bacon", "Renée"]
+    assert table.find("Kevin Bacon") == 1
+    assert table.find("Tom Hanks") is None
+
+
+def test_views_match_dicts():
+    names, people, movies = views(graph)
+    assert dict(names) == degrees.names
+    assert dict(people) == degrees.people
+    assert dict(movies) == degrees.movies
+
+
+@pytest.mark.parametrize("source,target,expected", [
+    ("102", "158", 1),
+    ("197", "398", 3),
+    ("102", "914612", None),
+])
+def test_shortest_path_on_compact(compact_degrees, source, target, expected):
+    path = degrees.shortest_path(source, target)
+    if expected is None:
+        assert path is None
+    else:
+        assert len(path) == expected
+
+
+@pytest.fixture
+def data_directory(tmp_path):
+    for filename in SOURCES:
+        (tmp_path / filename).write_bytes(open(f"small/{filename}", "rb").read())
+    return tmp_path
+
+
+def test_snapshot_round_trip(data_directory):
+    load(data_directory)
+    assert (data_directory / SNAPSHOT).exists()
+
+    snapshot = load_snapshot(data_directory / SNAPSHOT, source_stamps(data_directory))
+    assert snapshot is not None
+    for section, other in zip(snapshot.sections(), graph.sections()):
+        assert section[0] == other[0]
+        assert bytes(section[2]) == bytes(other[2])
+
+    names, people, movies = views(load(data_directory))
+    assert dict(people) == degrees.people
+    assert names["kevin bacon"] == {"102"}
+
+
+def test_snapshot_invalidated_by_csv_change(data_directory):
+    load(data_directory)
+    with open(data_directory / "people.csv", "a", encoding="utf-8") as f:
+        f.write('999,"New Person",2000\n')
+    assert load_snapshot(data_directory / SNAPSHOT, source_stamps(data_directory)) is None
+
+    names, people, movies = views(load(data_directory))
+    assert people["999"]["name"] == "New Person"
+    assert load_snapshot(data_directory / SNAPSHOT, source_stamps(data_directory)) is not None
+
+
+@pytest.mark.parametrize("keep", [4, 40, 0.5])
+def test_truncated_snapshot_rebuilt(data_directory, keep):
+    load(data_directory)
+    path = data_directory / SNAPSHOT
+    contents = path.read_bytes()
+    if isinstance(keep, float):
+        keep = int(len(contents) * keep)
+    path.write_bytes(contents[:keep])
+    assert load_snapshot(path, source_stamps(data_directory)) is None
+
+    names, people, movies = views(load(data_directory))
+    assert dict(people) == degrees.people
+    assert load_snapshot(path, source_stamps(data_directory)) is not None
@@ -0,0 +1,155 @@
+import pytest
+
+from degrees import *
+
+load_data("small")
+
+
+def assert_valid_path(source, target, path):
+    previous = source
+    for movie_id, person_id in path:
+        assert previous in movies[movie_id]["stars"]
+        assert person_id in movies[movie_id]["stars"]
+        previous = person_id
+    assert previous == target
+
+
+@pytest.mark.parametrize("frontier_class,order", [
+    (StackFrontier, ["c", "b", "a"]),
+    (QueueFrontier, ["a", "b", "c"]),
+])
+def test_frontier_order(frontier_class, order):
+    frontier = frontier_class()
+    for state in ["a", "b", "c"]:
+        frontier.add(Node(state, None, None))
+    assert len(frontier) == 3
+    assert [frontier.remove().state for _ in range(3)] == order
+    assert frontier.empty()
+    with pytest.raises(Exception):
+        frontier.remove()
+
+
+@pytest.mark.parametrize("frontier_class", [StackFrontier, QueueFrontier])
+def test_frontier_duplicate_states(frontier_class):
+    frontier = frontier_class()
+    frontier.add(Node("a", None, None))
+    frontier.add(Node("a", None, None))
+    frontier.add(Node("b", None, None))
+    removed = frontier.remove()
+    assert frontier.contains_state("a")
+    assert frontier.contains_state("b") == (removed.state != "b")
+    while not frontier.empty():
+        frontier.remove()
+    assert not frontier.contains_state("a")
+    assert not frontier.contains_state("b")
+
+
+@pytest.mark.parametrize("source,target,expected", [
+    ("102", "102", 0),          # Kevin Bacon to himself
+    ("102", "158", 1),          # Kevin Bacon and Tom Hanks
+    ("102", "129", 1),          # Kevin Bacon and Tom Cruise
+    ("197", "398", 3),          # Jack Nicholson and Sally Field
+    ("102", "914612", None),    # Emma Watson is not connected
+])
+def test_shortest_path(source, target, expected):
+    for bidirectional, movie_nodes in [(True, True), (True, False), (False, False)]:
+        path = shortest_path(source, target, bidirectional=bidirectional, movie_nodes=movie_nodes)
+        if expected is None:
+            assert path is None
+        else:
+            assert len(path) == expected
+            assert_valid_path(source, target, path)
+
+
+def test_bidirectional_matches_unidirectional():
+    for source in people:
+        for target in people:
+            unidirectional = shortest_path(source, target, bidirectional=False)
+            for movie_nodes in [True, False]:
+                bidirectional = shortest_path(source, target, movie_nodes=movie_nodes)
+                if unidirectional is None:
+                    assert bidirectional is None
+                else:
+                    assert len(bidirectional) == len(unidirectional)
+                    assert_valid_path(source, target, bidirectional)
+
+
+def test_bfs_tree_matches_shortest_path():
+    tree = bfs_tree("102")
+    for target in people:
+        path = path_from_tree(tree, target)
+        expected = shortest_path("102", target)
+        if expected is None:
+            assert path is None
+        else:
+            assert len(path) == len(expected)
+            assert_valid_path("102", target, path)
+
+
+def test_run_batch():
+    import io
+    import json
+
+    pairs = io.StringIO("Kevin Bacon\tTom Hanks\nKevin Bacon\tEmma Watson\nNobody\tTom Hanks\n")
+    output = io.StringIO()
+    run_batch(pairs, output)
+    results = [json.loads(line) for line in output.getvalue().splitlines()]
+
+    assert [result["line"] for result in results] == [1, 2, 3]
+    assert results[0]["degrees"] == 1
+    assert results[0]["path"] == [["112384", "158"]]
+    assert results[1]["path"] is None
+    assert results[2]["error"] == "person not found"
+
+
+def test_search_stats():
+    reports = []
+    for bidirectional in [True, False]:
+        stats = SearchStats(callback=reports.append)
+        path = shortest_path("197", "398", bidirectional=bidirectional, stats=stats)
+        assert len(path) == 3
+        assert stats.nodes_expanded > 0
+        assert stats.peak_frontier > 0
+        assert 0 <= stats.neighbor_time <= stats.wall_time
+        assert stats.memory_peak is None or stats.memory_peak > 0
+    assert len(reports) == 2
+
+    stats = SearchStats(trace_memory=True)
+    bfs_tree("102", stats=stats)
+    assert stats.nodes_expanded == sum(1 for person_id in people if person_id != "914612")
+    assert stats.memory_peak > 0
+
+
+def test_search_stats_keyword_only():
+    with pytest.raises(TypeError, match="positional"):
+        shortest_path("102", "158", True, True, SearchStats())
+    with pytest.raises(TypeError, match="positional"):
+        bfs_tree("102", None, SearchStats())
+
+
+def test_completion_builds_index_lazily(monkeypatch):
+    import sys
+    import types
+
+    import degrees
+
+    completers = []
+    readline = types.SimpleNamespace(
+        set_completer_delims=lambda delims: None,
+        set_completer=completers.append,
+        parse_and_bind=lambda command: None,
+    )
+    monkeypatch.setitem(sys.modules, "readline", readline)
+    monkeypatch.setattr(degrees, "name_index", None)
+
+    enable_completion()
+    assert degrees.name_index is None
+    assert completers[0]("kevin b", 0) == "kevin bacon"
+    assert degrees.name_index is not None
+
+
+def test_batch_rejects_unidirectional(capsys):
+    assert parse_args(["small", "--batch", "-"]).batch == "-"
+    with pytest.raises(SystemExit):
+        parse_args(["small", "--batch", "-", "--unidirectional"])
+    assert "--unidirectional" in capsys.readouterr().err
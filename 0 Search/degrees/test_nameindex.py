@@ -0,0 +1,58 @@
+import pytest
+
+import degrees
+from nameindex import *
+
+degrees.load_data("small")
+index = NameIndex.from_names(degrees.names)
+
+
+@pytest.mark.parametrize("a,b,bound,expected", [
+    ("kevin bacon", "kevin bacon", 2, 0),
+    ("kevin bacon", "kevn bacon", 2, 1),
+    ("kevin bacon", "kevin bakon", 2, 1),
+    ("tom hanks", "tom cruise", 2, 3),
+    ("tom", "tom hanks", 2, 3),
+])
+def test_edit_distance(a, b, bound, expected):
+    assert edit_distance(a, b, bound) == expected
+
+
+def test_prefix():
+    assert index.prefix("tom") == ["tom cruise", "tom hanks"]
+    assert index.prefix("TOM H") == ["tom hanks"]
+    assert index.prefix("zzz") == []
+
+
+@pytest.mark.parametrize("name,expected", [
+    ("Kevin Bacon", ["kevin bacon"]),
+    ("kevn bacn", ["kevin bacon"]),
+    ("Tom Hnks", ["tom hanks"]),
+    ("Mandy Patinkn", ["mandy patinkin"]),
+    ("Nobody At All", []),
+])
+def test_suggest(name, expected):
+    assert index.suggest(name) == expected
+
+
+def test_suggest_short_names():
+    short = NameIndex.from_names(["ab", "xy", "abcd", "wxyz", "abcdefgh"])
+    # "xy" shares no trigram with "ab" but is two substitutions away
+    assert short.suggest("ab") == ["ab", "abcd", "xy"]
+    assert short.suggest("wxy") == ["wxyz", "xy"]
+    assert short.suggest("") == ["ab", "xy"]
+
+
+def test_person_id_for_name_suggests(monkeypatch):
+    monkeypatch.setattr("builtins.input", lambda prompt: "1")
+    assert degrees.person_id_for_name("Kevn Bacon") == "102"
+
+
+def test_load_snapshot(tmp_path):
+    for filename in compact.SOURCES:
+        (tmp_path / filename).write_bytes(open(f"small/{filename}", "rb").read())
+    load(tmp_path, degrees.names)
+    assert (tmp_path / NAME_INDEX).exists()
+    snapshot = load(tmp_path, [])
+    assert list(snapshot.keys) == list(index.keys)
+    assert snapshot.suggest("kevn bacn") == ["kevin bacon"]
@@ -0,0 +1,29 @@
+from collections import Counter
+
+import degrees
+from compact import CompactGraph
+from separation import *
+
+degrees.load_data("small")
+graph = CompactGraph.from_csv("small")
+
+
+def test_histogram_matches_shortest_path():
+    arrays = [getattr(graph, name) for name in ADJACENCY]
+    for source in range(graph.num_people):
+        source_id = graph.person_ids[source]
+        expected = Counter()
+        for target_id in degrees.people:
+            path = degrees.shortest_path(source_id, target_id)
+            if path is not None:
+                expected[len(path)] += 1
+        histogram = separation_histogram(source, *arrays)
+        assert dict(enumerate(histogram)) == dict(expected)
+
+
+def test_separation_stats():
+    stats = separation_stats(graph, samples=100, workers=2)
+    assert stats["sources"] == graph.num_people
+    assert stats["pairs"] == sum(stats["histogram"].values())
+    assert stats["eccentricity"]["914612"] == 0
+    assert stats["diameter_estimate"] == max(stats["histogram"])
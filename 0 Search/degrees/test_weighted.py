@@ -0,0 +1,50 @@
+import pytest
+
+import degrees
+from weighted import *
+
+degrees.load_data("small")
+
+
+@pytest.mark.parametrize("source,target", [
+    ("102", "158"),
+    ("197", "398"),
+    ("1597", "420"),
+    ("102", "914612"),
+])
+def test_unit_cost_matches_bfs(source, target):
+    expected = degrees.shortest_path(source, target)
+    path = cheapest_path(source, target)
+    if expected is None:
+        assert path is None
+    else:
+        assert len(path) == len(expected)
+
+
+def test_edge_filter():
+    # Jack Nicholson reaches Sally Field only via A Few Good Men (1992)
+    path = cheapest_path("197", "398", edge_filter=released_after(1990))
+    assert len(path) == 3
+    assert cheapest_path("197", "398", edge_filter=released_after(1992)) is None
+
+    # Kevin Bacon and Tom Hanks share only Apollo 13 (1995)
+    assert cheapest_path("102", "158", edge_filter=released_between(1995, 1995)) == [("112384", "158")]
+    assert cheapest_path("102", "158", edge_filter=released_between(1980, 1994)) is None
+
+
+def test_movie_age_cost():
+    cost = movie_age(2020)
+    path = cheapest_path("102", "398", cost=cost)
+    # Apollo 13 (25 years) then Forrest Gump (26 years)
+    assert path_cost("102", path, cost) == 51
+
+
+def test_a_star_matches_dijkstra():
+    cost = movie_age(2020)
+    for target in degrees.people:
+        dijkstra = cheapest_path("102", target, cost=cost)
+        a_star = cheapest_path("102", target, cost=cost, heuristic=lambda person_id: 0)
+        if dijkstra is None:
+            assert a_star is None
+        else:
+            assert path_cost("102", a_star, cost) == path_cost("102", dijkstra, cost)
@@ -1,3 +1,15 @@
+import functools
+import sys
+import time
+import tracemalloc
+from collections import deque
+
+try:
+    import resource
+except ImportError:
+    resource = None
+
+
 class Node():
     def __init__(self, state, parent, action):
         self.state = state
@@ -7,32 +19,125 @@ class Node():
 
 class StackFrontier():
     def __init__(self):
-        self.frontier = []
+        self.frontier = deque()
+        # Number of nodes in the frontier for each state, for O(1) membership
+        self.states = {}
 
     def add(self, node):
         self.frontier.append(node)
+        self.states[node.state] = self.states.get(node.state, 0) + 1
 
     def contains_state(self, state):
-        return any(node.state == state for node in self.frontier)
+        return state in self.states
 
     def empty(self):
         return len(self.frontier) == 0
 
+    def __len__(self):
+        return len(self.frontier)
+
+    def _pop(self):
+        return self.frontier.pop()
+
     def remove(self):
         if self.empty():
             raise Exception("empty frontier")
         else:
-            node = self.frontier[-1]
-            self.frontier = self.frontier[:-1]
+            node = self._pop()
+            count = self.states[node.state] - 1
+            if count:
+                self.states[node.state] = count
+            else:
+                del self.states[node.state]
             return node
 
 
 class QueueFrontier(StackFrontier):
 
-    def remove(self):
-        if self.empty():
-            raise Exception("empty frontier")
-        else:
-            node = self.frontier[0]
-            self.frontier = self.frontier[1:]
-            return node
+    def _pop(self):
+        return self.frontier.popleft()
+
+
+class SearchStats():
+    """
+    Counters and timings for a single search. Pass one to a search function
+    to have it filled in; searches do no bookkeeping when given None.
+    """
+
+    def __init__(self, callback=None, trace_memory=False):
+        self.nodes_expanded = 0
+        self.peak_frontier = 0
+        self.neighbor_time = 0.0
+        self.wall_time = 0.0
+        # Bytes allocated by the search at its peak with trace_memory,
+        # otherwise the process's maximum resident set size, if known
+        self.memory_peak = None
+        self.callback = callback
+        self.trace_memory = trace_memory
+        self._start = None
+        self._tracing = False
+
+    def start(self):
+        if self.trace_memory and not tracemalloc.is_tracing():
+            tracemalloc.start()
+            self._tracing = True
+        self._start = time.perf_counter()
+
+    def finish(self):
+        self.wall_time = time.perf_counter() - self._start
+        if self.trace_memory:
+            self.memory_peak = tracemalloc.get_traced_memory()[1]
+            if self._tracing:
+                tracemalloc.stop()
+                self._tracing = False
+        elif resource is not None:
+            # ru_maxrss is in kilobytes on Linux and bytes on macOS
+            maxrss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+            self.memory_peak = maxrss if sys.platform == "darwin" else maxrss * 1024
+        if self.callback is not None:
+            self.callback(self)
+
+    def frontier(self, size):
+        """
+        Records the current frontier size.
+        """
+        if size > self.peak_frontier:
+            self.peak_frontier = size
+
+    def timed(self, neighbors):
+        """
+        Wraps a neighbor function so the time spent generating
+        neighbors is added to neighbor_time.
+        """
+        def wrapper(*args):
+            start = time.perf_counter()
+            result = list(neighbors(*args))
+            self.neighbor_time += time.perf_counter() - start
+            return result
+        return wrapper
+
+    def as_dict(self):
+        return {
+            "nodes_expanded": self.nodes_expanded,
+            "peak_frontier": self.peak_frontier,
+            "neighbor_time": self.neighbor_time,
+            "wall_time": self.wall_time,
+            "memory_peak": self.memory_peak,
+        }
+
+
+def instrumented(search):
+    """
+    Decorator for search functions taking a keyword-only stats argument:
+    starts and finishes the SearchStats around the search when one is given.
+    """
+    @functools.wraps(search)
+    def wrapper(*args, stats=None, **kwargs):
+        if stats is None:
+            return search(*args, stats=None, **kwargs)
+        stats.start()
+        try:
+            return search(*args, stats=stats, **kwargs)
+        finally:
+            stats.finish()
+    return wrapper
@@ -0,0 +1,114 @@
+"""
+Weighted and constrained path search over the degrees graph.
+
+Generalizes degrees.shortest_path: each (movie_id, person_id, neighbor_id)
+edge can be given a cost and movies can be excluded by a filter, and the
+search runs Dijkstra (or A*, when given an admissible heuristic) with a
+binary heap. Paths are returned in the same (movie_id, person_id) format.
+"""
+
+import heapq
+import itertools
+
+import degrees
+from util import instrumented
+
+
+def unit_cost(movie_id, person_id, neighbor_id):
+    """
+    Every hop costs 1, so the cheapest path is the shortest path.
+    """
+    return 1
+
+
+def movie_age(current_year):
+    """
+    Returns a cost function charging each hop the age of its movie
+    in current_year (at least 0).
+    """
+    def cost(movie_id, person_id, neighbor_id):
+        return max(0, current_year - movie_year(movie_id))
+    return cost
+
+
+def released_after(year):
+    """
+    Returns an edge filter that only allows movies released after year.
+    """
+    return lambda movie_id: movie_year(movie_id) > year
+
+
+def released_between(start, end):
+    """
+    Returns an edge filter that only allows movies released
+    in the years start to end inclusive.
+    """
+    return lambda movie_id: start <= movie_year(movie_id) <= end
+
+
+def movie_year(movie_id):
+    """
+    Returns the year of a movie as an int, or 0 if it is unknown.
+    """
+    year = degrees.movies[movie_id]["year"]
+    return int(year) if year else 0
+
+
+@instrumented
+def cheapest_path(source, target, cost=unit_cost, edge_filter=None, heuristic=None, *,
+                  stats=None):
+    """
+    Returns the list of (movie_id, person_id) pairs connecting source to
+    target with the least total cost, or None if no path is allowed.
+
+    cost(movie_id, person_id, neighbor_id) must be non-negative.
+    edge_filter(movie_id), if given, decides whether a movie may be used.
+    heuristic(person_id), if given, must never overestimate the remaining
+    cost to target; the search is then A* instead of Dijkstra.
+    If stats is a SearchStats, it is filled in for this search.
+    """
+    # Breaks ties between equal priorities without comparing person_ids
+    counter = itertools.count()
+    best = {source: 0}
+    parents = {source: None}
+    allowed = {}
+
+    frontier = [(heuristic(source) if heuristic else 0, next(counter), 0, source)]
+    while frontier:
+        _, _, distance, person_id = heapq.heappop(frontier)
+
+        # Skip entries superseded by a cheaper push of the same person
+        if distance > best[person_id]:
+            continue
+        if person_id == target:
+            return degrees.path_from_tree(parents, target)
+        if stats is not None:
+            stats.frontier(len(frontier) + 1)
+            stats.nodes_expanded += 1
+
+        for movie_id in degrees.people[person_id]["movies"]:
+            if edge_filter is not None:
+                if movie_id not in allowed:
+                    allowed[movie_id] = edge_filter(movie_id)
+                if not allowed[movie_id]:
+                    continue
+            for neighbor_id in degrees.movies[movie_id]["stars"]:
+                candidate = distance + cost(movie_id, person_id, neighbor_id)
+                if candidate < best.get(neighbor_id, float("inf")):
+                    best[neighbor_id] = candidate
+                    parents[neighbor_id] = (movie_id, person_id)
+                    priority = candidate + (heuristic(neighbor_id) if heuristic else 0)
+                    heapq.heappush(frontier, (priority, next(counter), candidate, neighbor_id))
+
+    return None
+
+
+def path_cost(source, path, cost=unit_cost):
+    """
+    Returns the total cost of a (movie_id, person_id) path from source.
+    """
+    total = 0
+    for movie_id, person_id in path:
+        total += cost(movie_id, source, person_id)
+        source = person_id
+    return total
@@ -0,0 +1,186 @@
+"""
+Self-play benchmark for the tic-tac-toe engines.
+
+Plays every engine against itself and against a random player through the
+tictactoe API, timing each move, and checks that perfect play never loses
+and always draws from the empty board. Results are written as JSON so runs
+can be diffed; the exit status is 1 if any correctness check fails.
+
+Usage: python benchmark.py [--games N] [--seed S] [--cold] [--output FILE] [engines...]
+"""
+
+import argparse
+import json
+import math
+import platform
+import random
+import sys
+import time
+
+import bitboard
+import tictactoe as ttt
+
+
+def book_engine(board):
+    return ttt.minimax(board)
+
+
+def search_engine(board):
+    return ttt.solve(board)[0]
+
+
+def bitboard_engine(board):
+    return bitboard.minimax(bitboard.Board.from_rows(board))
+
+
+# Perfect players, each with the module whose nodes_searched it advances
+ENGINES = {
+    "tictactoe": (book_engine, ttt),
+    "search": (search_engine, ttt),
+    "bitboard": (bitboard_engine, bitboard),
+}
+
+
+class Player():
+    """
+    An engine playing through the tictactoe API, with its move timings.
+    A cold player clears its transposition table before every move.
+    """
+
+    def __init__(self, name, rng=None, cold=False):
+        self.name = name
+        self.rng = rng
+        self.cold = cold
+        self.times = []
+        self.nodes = 0
+        self.book_hits = 0
+        if name != "random":
+            self.engine, self.module = ENGINES[name]
+            self.module.transpositions.clear()
+
+    def move(self, board):
+        """
+        Returns the player's action on board, recording how long it took.
+        """
+        if self.name == "random":
+            return self.rng.choice(sorted(ttt.actions(board)))
+        if self.cold:
+            self.module.transpositions.clear()
+        nodes = self.module.nodes_searched
+        book_hits = getattr(self.module, "book_hits", 0)
+        start = time.perf_counter()
+        action = self.engine(board)
+        self.times.append(time.perf_counter() - start)
+        self.nodes += self.module.nodes_searched - nodes
+        self.book_hits += getattr(self.module, "book_hits", 0) - book_hits
+        return action
+
+
+def play(x, o):
+    """
+    Plays one game from the empty board. Returns its utility.
+    """
+    board = ttt.initial_state()
+    while not ttt.terminal(board):
+        mover = x if ttt.player(board) == ttt.X else o
+        board = ttt.result(board, mover.move(board))
+    return ttt.utility(board)
+
+
+def match(x, o, games):
+    """
+    Plays games games between x (as X) and o. Returns their outcome rates.
+    """
+    outcomes = {1: 0, 0: 0, -1: 0}
+    for _ in range(games):
+        outcomes[play(x, o)] += 1
+    return {
+        "x": x.name,
+        "o": o.name,
+        "games": games,
+        "x_wins": outcomes[1] / games,
+        "draws": outcomes[0] / games,
+        "o_wins": outcomes[-1] / games,
+    }
+
+
+def timings(player):
+    """
+    Returns the move time and node statistics of player. nodes_per_second
+    is None when no nodes were searched, as when every move came from the
+    opening book, since it would then say nothing about search speed.
+    """
+    times = sorted(player.times)
+    total = sum(times)
+    return {
+        "moves": len(times),
+        "mean_ms": total / len(times) * 1000,
+        "p99_ms": times[math.ceil(0.99 * len(times)) - 1] * 1000,
+        "nodes": player.nodes,
+        "nodes_per_second": player.nodes / total if player.nodes and total else None,
+        "book_hits": player.book_hits,
+    }
+
+
+def run(engines, games, seed=0, cold=False):
+    """
+    Benchmarks each named engine. Returns the results as a dict.
+    """
+    rng = random.Random(seed)
+    results = {
+        "python": platform.python_version(),
+        "games": games,
+        "seed": seed,
+        "cold": cold,
+        "engines": {},
+        "ok": True,
+    }
+    for name in engines:
+        player = Player(name, cold=cold)
+        opponent = Player("random", rng)
+        matches = [
+            match(player, player, games),
+            match(player, opponent, games),
+            match(opponent, player, games),
+        ]
+        checks = {
+            "self_play_draws": matches[0]["draws"] == 1,
+            "never_loses_as_x": matches[1]["o_wins"] == 0,
+            "never_loses_as_o": matches[2]["x_wins"] == 0,
+        }
+        results["engines"][name] = {
+            "matches": matches,
+            "timing": timings(player),
+            "checks": checks,
+        }
+        results["ok"] = results["ok"] and all(checks.values())
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Self-play benchmark for the tic-tac-toe engines.")
+    parser.add_argument("engines", nargs="*",
+                        help=f"engines to benchmark (default: all of {', '.join(ENGINES)})")
+    parser.add_argument("--games", type=int, default=100, help="games per match")
+    parser.add_argument("--seed", type=int, default=0, help="seed for the random player")
+    parser.add_argument("--cold", action="store_true",
+                        help="clear transposition tables before every move")
+    parser.add_argument("--output", help="write the JSON results here instead of stdout")
+    args = parser.parse_args()
+    for name in args.engines:
+        if name not in ENGINES:
+            parser.error(f"unknown engine {name!r}")
+
+    results = run(args.engines or list(ENGINES), args.games, args.seed, args.cold)
+    text = json.dumps(results, indent=2, sort_keys=True)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(text + "\n")
+    else:
+        print(text)
+    if not results["ok"]:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,296 @@
+"""
+Tic Tac Toe Player on bitboards
+
+Same API as tictactoe.py, so runner.py can `import bitboard as ttt`.
+A board is two 9-bit masks, one per player, where bit 3 * i + j is
+cell (i, j). Wins are looked up in a table precomputed from the 8 line
+masks, and the search makes and unmakes moves on plain ints.
+"""
+
+X = "X"
+O = "O"
+EMPTY = None
+
+FULL = 0b111111111
+
+# The 8 lines of three cells that win the game, as masks
+LINES = [
+    0b000000111, 0b000111000, 0b111000000,     # rows
+    0b001001001, 0b010010010, 0b100100100,     # columns
+    0b100010001, 0b001010100,                  # diagonals
+]
+
+# WINS[mask] is True if mask contains a full line
+WINS = [any(mask & line == line for line in LINES) for mask in range(FULL + 1)]
+
+# POPCOUNT[mask] is the number of cells set in mask
+POPCOUNT = [bin(mask).count("1") for mask in range(FULL + 1)]
+
+# Move ordering: center, then corners, then edges
+ORDER = [1 << cell for cell in [4, 0, 2, 6, 8, 1, 3, 5, 7]]
+
+
+def _permutation(transform):
+    """
+    Returns a table mapping every mask to its image under a cell transform.
+    """
+    cells = [transform(cell // 3, cell % 3) for cell in range(9)]
+    table = []
+    for mask in range(FULL + 1):
+        image = 0
+        for cell, (i, j) in enumerate(cells):
+            if mask >> cell & 1:
+                image |= 1 << (3 * i + j)
+        table.append(image)
+    return table
+
+
+# The 8 rotations and reflections of the board, as mask lookup tables
+SYMMETRIES = [
+    _permutation(transform)
+    for transform in [
+        lambda i, j: (i, j),
+        lambda i, j: (j, 2 - i),
+        lambda i, j: (2 - i, 2 - j),
+        lambda i, j: (2 - j, i),
+        lambda i, j: (i, 2 - j),
+        lambda i, j: (2 - i, j),
+        lambda i, j: (j, i),
+        lambda i, j: (2 - j, 2 - i),
+    ]
+]
+
+# Transposition table of negamax values, from the mover's point of view,
+# keyed by canonical(x, o) and kept across minimax calls
+transpositions = {}
+
+# Number of positions minimax has searched, for benchmarking
+nodes_searched = 0
+
+
+class Board():
+    """
+    Immutable board of two masks that can be indexed like the nested
+    lists of tictactoe.py: board[i][j] is X, O or EMPTY.
+    """
+
+    __slots__ = ("x", "o")
+
+    def __init__(self, x=0, o=0):
+        self.x = x
+        self.o = o
+
+    @classmethod
+    def from_rows(cls, rows):
+        x = o = 0
+        for i, row in enumerate(rows):
+            for j, cell in enumerate(row):
+                if cell == X:
+                    x |= 1 << (3 * i + j)
+                elif cell == O:
+                    o |= 1 << (3 * i + j)
+        return cls(x, o)
+
+    def __getitem__(self, i):
+        return tuple(
+            X if self.x >> cell & 1 else O if self.o >> cell & 1 else EMPTY
+            for cell in range(3 * i, 3 * i + 3)
+        )
+
+    def __len__(self):
+        return 3
+
+    def __iter__(self):
+        return (self[i] for i in range(3))
+
+    def __eq__(self, other):
+        return isinstance(other, Board) and (self.x, self.o) == (other.x, other.o)
+
+    def __hash__(self):
+        return hash((self.x, self.o))
+
+    def __repr__(self):
+        return f"Board({[list(row) for row in self]})"
+
+
+def canonical(x, o):
+    """
+    Returns a key for (x, o) that is the same for all 8 of its
+    rotations and reflections.
+    """
+    return min(table[x] << 9 | table[o] for table in SYMMETRIES)
+
+
+def initial_state():
+    """
+    Returns starting state of the board.
+    """
+    return Board()
+
+
+def player(board):
+    """
+    Returns player who has the next turn on a board.
+    """
+    return X if POPCOUNT[board.x] <= POPCOUNT[board.o] else O
+
+
+def actions(board):
+    """
+    Returns set of all possible actions (i, j) available on the board.
+    """
+    empty = ~(board.x | board.o) & FULL
+    allowed = set()
+    while empty:
+        bit = empty & -empty
+        cell = bit.bit_length() - 1
+        allowed.add((cell // 3, cell % 3))
+        empty ^= bit
+    return allowed
+
+
+def result(board, action):
+    """
+    Returns the board that results from making move (i, j) on the board.
+    """
+    i, j = action
+    if not (0 <= i < 3 and 0 <= j < 3):
+        raise Exception(f'Invalid action {action} on board: {board}')
+    bit = 1 << (3 * i + j)
+    if (board.x | board.o) & bit:
+        raise Exception(f'Invalid action {action} on board: {board}')
+    if player(board) == X:
+        return Board(board.x | bit, board.o)
+    return Board(board.x, board.o | bit)
+
+
+def winner(board):
+    """
+    Returns the winner of the game, if there is one.
+    """
+    if WINS[board.x]:
+        return X
+    if WINS[board.o]:
+        return O
+    return None
+
+
+def terminal(board):
+    """
+    Returns True if game is over, False otherwise.
+    """
+    return WINS[board.x] or WINS[board.o] or (board.x | board.o) == FULL
+
+
+def utility(board):
+    """
+    Returns 1 if X has won the game, -1 if O has won, 0 otherwise.
+    """
+    if WINS[board.x]:
+        return 1
+    if WINS[board.o]:
+        return -1
+    return 0
+
+
+def _moves(me, them):
+    """
+    Returns the move bits worth searching for the player on mask me, in
+    order: a winning move, else the moves blocking an immediate loss,
+    else every empty cell.
+    """
+    empty = ~(me | them) & FULL
+    moves = [bit for bit in ORDER if empty & bit]
+    for bit in moves:
+        if WINS[me | bit]:
+            return [bit]
+    blocks = [bit for bit in moves if WINS[them | bit]]
+    return blocks or moves
+
+
+def _negamax(me, them, alpha, beta):
+    """
+    Returns the value of the position for the player to move on mask me:
+    1 for a win, -1 for a loss, 0 for a draw.
+
+    The opponent has just moved, so only it can have won.
+    """
+    global nodes_searched
+    nodes_searched += 1
+    if WINS[them]:
+        return -1
+    if me | them == FULL:
+        return 0
+
+    key = canonical(me, them)
+    entry = transpositions.get(key)
+    if entry is not None:
+        lower, upper = entry
+        if lower == upper:
+            return lower
+        alpha = max(alpha, lower)
+        beta = min(beta, upper)
+        if alpha >= beta:
+            return lower if lower >= beta else upper
+    alpha_original = alpha
+
+    best = -2
+    seen = set()
+    for bit in _moves(me, them):
+        # Make the move; the new position is the opponent's to play
+        mine = me | bit
+        child = canonical(them, mine)
+        if child in seen:
+            continue
+        seen.add(child)
+        value = -_negamax(them, mine, -beta, -alpha)
+        if value > best:
+            best = value
+            alpha = max(alpha, value)
+            if alpha >= beta:
+                break
+
+    # Store as bounds: a fail-low value is an upper bound, a fail-high
+    # value a lower bound, anything in between exact
+    lower, upper = -1, 1
+    if best <= alpha_original:
+        upper = best
+    elif best >= beta:
+        lower = best
+    else:
+        lower = upper = best
+    if entry is not None:
+        lower, upper = max(lower, entry[0]), min(upper, entry[1])
+    transpositions[key] = (lower, upper)
+    return best
+
+
+def minimax(board):
+    """
+    Returns the optimal action for the current player on the board.
+    """
+    if terminal(board):
+        return None
+    if player(board) == X:
+        me, them = board.x, board.o
+    else:
+        me, them = board.o, board.x
+
+    best = -2
+    optimal_action = None
+    seen = set()
+    for bit in _moves(me, them):
+        mine = me | bit
+        child = canonical(them, mine)
+        if child in seen:
+            continue
+        seen.add(child)
+        # Only strictly better moves need an exact value
+        value = -_negamax(them, mine, -2, -best)
+        if value > best:
+            best = value
+            cell = bit.bit_length() - 1
+            optimal_action = (cell // 3, cell % 3)
+            if best == 1:
+                break
+    return optimal_action
@@ -0,0 +1,60 @@
+"""
+Generates the tic-tac-toe opening book.
+
+Solves every reachable position once with tictactoe.solve and writes
+the best move and value for each canonical position to book.bin, which
+tictactoe.minimax consults before searching.
+
+Usage: python book.py [output]
+"""
+
+import sys
+
+import tictactoe as ttt
+
+
+def reachable_positions():
+    """
+    Returns a dict mapping the canonical key of every non-terminal
+    position reachable from the initial state to one such board.
+    """
+    positions = {}
+    frontier = [ttt.initial_state()]
+    while frontier:
+        board = frontier.pop()
+        key = ttt.canonical(board)
+        if key in positions or ttt.terminal(board):
+            continue
+        positions[key] = board
+        for action in ttt.actions(board):
+            frontier.append(ttt.result(board, action))
+    return positions
+
+
+def generate():
+    """
+    Returns the contents of a complete opening book.
+    """
+    # Search everything from scratch rather than from an older book
+    ttt.book = None
+
+    entries = bytearray(ttt.BOOK_SIZE)
+    for board in reachable_positions().values():
+        action, value = ttt.solve(board)
+        key, entry = ttt.encode_book_entry(board, action, value)
+        entries[key] = entry
+    return ttt.BOOK_MAGIC + bytes(entries)
+
+
+def main():
+    if len(sys.argv) > 2:
+        sys.exit("Usage: python book.py [output]")
+    path = sys.argv[1] if len(sys.argv) == 2 else ttt.BOOK_FILE
+    data = generate()
+    with open(path, "wb") as f:
+        f.write(data)
+    print(f"Wrote {sum(1 for entry in data[len(ttt.BOOK_MAGIC):] if entry)} positions to {path}")
+
+
+if __name__ == "__main__":
+    main()
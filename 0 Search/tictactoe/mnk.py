@@ -0,0 +1,421 @@
+"""
+m,n,k-game Player
+
+Generalizes tictactoe.py to a board of any size where k in a row wins
+(3,3,3 is tic-tac-toe, 15,15,5 is Gomoku). Full minimax is intractable
+beyond small boards, so minimax runs iterative-deepening alpha-beta under
+a per-move time budget, orders moves with killer and history heuristics,
+scores positions heuristically at the depth cutoff, and returns the best
+move found when the deadline passes. parallel_minimax instead searches to
+a fixed depth with the root moves split across a process pool.
+
+Boards are nested lists of X, O and EMPTY, as in tictactoe.py.
+"""
+
+import time
+from multiprocessing import Pool, Value
+
+X = "X"
+O = "O"
+EMPTY = None
+
+# Score of a won position; wins found sooner score higher
+WIN = 10 ** 12
+
+# Check the clock every this many nodes
+CLOCK_INTERVAL = 64
+
+
+class Timeout(Exception):
+    """
+    Raised inside a search when its deadline has passed.
+    """
+
+
+class Game():
+    """
+    Rules and search for an m,n,k-game: rows x cols, k in a row wins.
+    """
+
+    def __init__(self, rows=3, cols=3, k=3, neighborhood=None):
+        if not 1 <= k <= max(rows, cols):
+            raise ValueError(f"cannot get {k} in a row on a {rows}x{cols} board")
+        self.rows = rows
+        self.cols = cols
+        self.k = k
+        self.size = rows * cols
+
+        # Only consider moves within this many cells of a stone; small
+        # boards search every empty cell
+        if neighborhood is None:
+            neighborhood = 0 if self.size <= 16 else 2
+        self.neighborhood = neighborhood
+
+        # Every run of k cells in a row, column or diagonal, as flat indices
+        self.lines = []
+        for i in range(rows):
+            for j in range(cols):
+                for di, dj in [(0, 1), (1, 0), (1, 1), (1, -1)]:
+                    end_i, end_j = i + (k - 1) * di, j + (k - 1) * dj
+                    if 0 <= end_i < rows and 0 <= end_j < cols:
+                        self.lines.append(tuple((i + s * di) * cols + j + s * dj
+                                                for s in range(k)))
+        self.cell_lines = [[] for _ in range(self.size)]
+        for index, line in enumerate(self.lines):
+            for cell in line:
+                self.cell_lines[cell].append(index)
+
+        # Cells closer to the center are tried first among otherwise equal moves
+        center_i, center_j = (rows - 1) / 2, (cols - 1) / 2
+        self.centrality = [
+            -(abs(cell // cols - center_i) + abs(cell % cols - center_j))
+            for cell in range(self.size)
+        ]
+        self.near = [
+            [r * cols + c
+             for r in range(max(0, cell // cols - neighborhood), min(rows, cell // cols + neighborhood + 1))
+             for c in range(max(0, cell % cols - neighborhood), min(cols, cell % cols + neighborhood + 1))]
+            for cell in range(self.size)
+        ]
+
+    def initial_state(self):
+        """
+        Returns starting state of the board.
+        """
+        return [[EMPTY] * self.cols for _ in range(self.rows)]
+
+    def player(self, board):
+        """
+        Returns player who has the next turn on a board.
+        """
+        x_count = sum(row.count(X) for row in board)
+        o_count = sum(row.count(O) for row in board)
+        return X if x_count <= o_count else O
+
+    def actions(self, board):
+        """
+        Returns set of all possible actions (i, j) available on the board.
+        """
+        return set((i, j) for i in range(self.rows) for j in range(self.cols)
+                   if board[i][j] is EMPTY)
+
+    def result(self, board, action):
+        """
+        Returns the board that results from making move (i, j) on the board.
+        """
+        i, j = action
+        if not (0 <= i < self.rows and 0 <= j < self.cols) or board[i][j] is not EMPTY:
+            raise Exception(f'Invalid action {action} on board: {board}')
+        new_board = [row[:] for row in board]
+        new_board[i][j] = self.player(board)
+        return new_board
+
+    def winner(self, board):
+        """
+        Returns the winner of the game, if there is one.
+        """
+        cells = [cell for row in board for cell in row]
+        for line in self.lines:
+            first = cells[line[0]]
+            if first is not EMPTY and all(cells[cell] == first for cell in line):
+                return first
+        return None
+
+    def terminal(self, board):
+        """
+        Returns True if game is over, False otherwise.
+        """
+        return (self.winner(board) is not None
+                or all(cell is not EMPTY for row in board for cell in row))
+
+    def utility(self, board):
+        """
+        Returns 1 if X has won the game, -1 if O has won, 0 otherwise.
+        """
+        winning_player = self.winner(board)
+        if winning_player == X:
+            return 1
+        elif winning_player == O:
+            return -1
+        return 0
+
+    def minimax(self, board, time_limit=1.0, max_depth=None):
+        """
+        Returns the best action found for the current player on the board
+        within time_limit seconds (None for no limit), searching at most
+        max_depth plies ahead (None for the rest of the game).
+        """
+        if self.terminal(board):
+            return None
+        return Search(self, board, time_limit).iterate(max_depth).action
+
+    def parallel_minimax(self, board, max_depth=None, workers=None):
+        """
+        Returns the best action for the current player on the board searched
+        max_depth plies ahead (None for the rest of the game), with the root
+        moves split across workers processes (None for one per CPU).
+
+        The action is the one a single-process search to the same depth
+        picks, however the work is scheduled.
+        """
+        if self.terminal(board):
+            return None
+        empty = sum(cell is EMPTY for row in board for cell in row)
+        depth = empty if max_depth is None else min(max_depth, empty)
+        return parallel_root(self, board, depth, workers)[0]
+
+
+class Search():
+    """
+    State of one move's search: the board as a flat list of 0 (X),
+    1 (O) or None, and how many stones each player has in every line.
+    """
+
+    def __init__(self, game, board, time_limit=None):
+        self.game = game
+        self.cells = [None] * game.size
+        self.counts = [[0] * len(game.lines), [0] * len(game.lines)]
+        self.stones = 0
+        for i, row in enumerate(board):
+            for j, cell in enumerate(row):
+                if cell is not EMPTY:
+                    self.place(i * game.cols + j, 0 if cell == X else 1)
+        self.to_move = 0 if game.player(board) == X else 1
+
+        self.deadline = None if time_limit is None else time.perf_counter() + time_limit
+        self.nodes = 0
+
+        # Up to two moves per ply that caused a cutoff, most recent first
+        self.killers = [[] for _ in range(game.size + 1)]
+        # Per player and cell, how much that move has caused cutoffs
+        self.history = [[0] * game.size, [0] * game.size]
+
+        # Best root move and its value from the deepest search so far
+        self.action = None
+        self.value = None
+        self.depth = 0
+
+    def place(self, cell, player):
+        """
+        Puts player's stone on cell. Returns True if that wins the game.
+        """
+        self.cells[cell] = player
+        self.stones += 1
+        counts = self.counts[player]
+        won = False
+        for line in self.game.cell_lines[cell]:
+            counts[line] += 1
+            if counts[line] == self.game.k:
+                won = True
+        return won
+
+    def remove(self, cell, player):
+        """
+        Takes player's stone back off cell.
+        """
+        self.cells[cell] = None
+        self.stones -= 1
+        counts = self.counts[player]
+        for line in self.game.cell_lines[cell]:
+            counts[line] -= 1
+
+    def evaluate(self, player):
+        """
+        Heuristic value of the position for player: every line still open
+        to only one player is worth more the more of its stones it holds.
+        """
+        score = 0
+        mine, theirs = self.counts[player], self.counts[1 - player]
+        for line in range(len(mine)):
+            if not theirs[line]:
+                if mine[line]:
+                    score += 4 ** mine[line]
+            elif not mine[line]:
+                score -= 4 ** theirs[line]
+        return score
+
+    def candidates(self):
+        """
+        Returns the empty cells worth considering as moves.
+        """
+        cells = self.cells
+        if not self.game.neighborhood or not self.stones:
+            if not self.stones and self.game.neighborhood:
+                return [max(range(self.game.size), key=self.game.centrality.__getitem__)]
+            return [cell for cell in range(self.game.size) if cells[cell] is None]
+        near = set()
+        for cell in range(self.game.size):
+            if cells[cell] is not None:
+                near.update(self.game.near[cell])
+        return [cell for cell in near if cells[cell] is None]
+
+    def ordered(self, player, ply, first=None):
+        """
+        Returns candidate moves, best guesses first: the given first move,
+        then killer moves at this ply, then by history and centrality.
+        """
+        killers = self.killers[ply]
+        history = self.history[player]
+        centrality = self.game.centrality
+
+        def priority(cell):
+            if cell == first:
+                return (0, 0, 0)
+            if cell in killers:
+                return (1, killers.index(cell), 0)
+            return (2, -history[cell], -centrality[cell])
+        return sorted(self.candidates(), key=priority)
+
+    def negamax(self, player, depth, alpha, beta, ply):
+        """
+        Returns the value of the position for player, who is to move,
+        searched depth plies ahead with alpha-beta window (alpha, beta).
+        """
+        self.nodes += 1
+        if self.nodes % CLOCK_INTERVAL == 0 and self.deadline is not None:
+            if time.perf_counter() > self.deadline:
+                raise Timeout
+        if depth == 0:
+            return self.evaluate(player)
+
+        moves = self.ordered(player, ply)
+        if not moves:
+            return 0
+
+        best = -WIN * 2
+        for cell in moves:
+            value = self.value_of(cell, player, depth, alpha, beta, ply)
+            if value > best:
+                best = value
+            if value > alpha:
+                alpha = value
+            if alpha >= beta:
+                self.cutoff(cell, player, depth, ply)
+                break
+        return best
+
+    def value_of(self, cell, player, depth, alpha, beta, ply):
+        """
+        Returns the value for player of playing cell, searched to depth.
+        """
+        if self.place(cell, player):
+            value = WIN - ply
+        elif self.stones == self.game.size:
+            value = 0
+        else:
+            try:
+                value = -self.negamax(1 - player, depth - 1, -beta, -alpha, ply + 1)
+            except Timeout:
+                self.remove(cell, player)
+                raise
+        self.remove(cell, player)
+        return value
+
+    def cutoff(self, cell, player, depth, ply):
+        """
+        Records that cell caused a beta cutoff at ply.
+        """
+        killers = self.killers[ply]
+        if cell in killers:
+            killers.remove(cell)
+        killers.insert(0, cell)
+        del killers[2:]
+        self.history[player][cell] += depth * depth
+
+    def root(self, depth):
+        """
+        Searches every root move to depth, the previous best move first.
+        Updates action and value as soon as a root move proves better.
+        """
+        player = self.to_move
+        first = None if self.action is None else self.action[0] * self.game.cols + self.action[1]
+        moves = self.ordered(player, 0, first=first)
+        best = -WIN * 2
+        alpha, beta = -WIN * 2, WIN * 2
+        for cell in moves:
+            value = self.value_of(cell, player, depth, alpha, beta, 0)
+            # The previous best move is searched first, so any move that
+            # beats it at this depth is safe to adopt even if time runs out
+            if value > best:
+                best = value
+                self.action = divmod(cell, self.game.cols)
+                self.value = value
+            if value > alpha:
+                alpha = value
+        self.depth = depth
+
+    def iterate(self, max_depth=None):
+        """
+        Deepens the search one ply at a time until max_depth, a proven
+        result, or the deadline. Returns self with action set.
+        """
+        empty = self.game.size - self.stones
+        max_depth = empty if max_depth is None else min(max_depth, empty)
+        moves = self.ordered(self.to_move, 0)
+        if not moves:
+            return self
+        self.action = divmod(moves[0], self.game.cols)
+        for depth in range(1, max_depth + 1):
+            try:
+                self.root(depth)
+            except Timeout:
+                break
+            if abs(self.value) >= WIN - self.game.size:
+                break
+        return self
+
+
+# This worker's (search, depth, alpha) for the root being split
+_root = None
+
+
+def _attach(game, board, depth, alpha):
+    """
+    Pool initializer: sets up this worker to search root moves of board.
+    """
+    global _root
+    _root = (Search(game, board), depth, alpha)
+
+
+def _search_root_move(task):
+    """
+    Pool task: returns (index, value, exact) for one root move.
+
+    The move is searched with alpha just below the best value any worker
+    has found so far, so it is pruned if it cannot at least tie, and its
+    value is exact whenever it does.
+    """
+    index, cell = task
+    search, depth, alpha = _root
+    bound = alpha.value
+    value = search.value_of(cell, search.to_move, depth, bound - 1, WIN * 2, 0)
+    with alpha.get_lock():
+        if value > alpha.value:
+            alpha.value = value
+    return index, value, value >= bound
+
+
+def parallel_root(game, board, depth, workers=None):
+    """
+    Searches board to depth with its root moves split across a process
+    pool. Returns ((i, j), value) for the best move, ties going to the
+    move a single-process search would have tried first.
+    """
+    search = Search(game, board)
+    moves = search.ordered(search.to_move, 0)
+    if not moves:
+        return None, 0
+
+    # Search the likely best move first to give the others a bound
+    first = search.value_of(moves[0], search.to_move, depth, -WIN * 2, WIN * 2, 0)
+    best = (first, 0)
+    if first < WIN and len(moves) > 1:
+        alpha = Value("q", first)
+        with Pool(workers, initializer=_attach, initargs=(game, board, depth, alpha)) as pool:
+            tasks = enumerate(moves[1:], start=1)
+            for index, value, exact in pool.imap_unordered(_search_root_move, tasks):
+                # A move that failed low scored below some other move
+                if exact and (value, -index) > (best[0], -best[1]):
+                    best = (value, index)
+    value, index = best
+    return divmod(moves[index], game.cols), value
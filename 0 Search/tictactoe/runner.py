@@ -1,6 +1,8 @@
 import pygame
 import sys
+import threading
 import time
+from concurrent.futures import Future
 
 import tictactoe as ttt
 
@@ -17,9 +19,37 @@ mediumFont = pygame.font.Font("OpenSans-Regular.ttf", 28)
 largeFont = pygame.font.Font("OpenSans-Regular.ttf", 40)
 moveFont = pygame.font.Font("OpenSans-Regular.ttf", 60)
 
+
+def think(board):
+    """
+    Starts computing the AI's move on board in a background thread, so the
+    window keeps responding. Returns a Future for the move. The thread is a
+    daemon so quitting never waits for a search to finish. Searches are not
+    interruptible: one is only started when it is the AI's turn, and the
+    game cannot be reset until it is over, so no search is ever abandoned.
+    """
+    future = Future()
+
+    def run():
+        if not future.set_running_or_notify_cancel():
+            return
+        try:
+            future.set_result(ttt.minimax(board))
+        except BaseException as error:
+            future.set_exception(error)
+
+    threading.Thread(target=run, daemon=True).start()
+    return future
+
+
+clock = pygame.time.Clock()
+
 user = None
 board = ttt.initial_state()
-ai_turn = False
+
+# Pending AI move, and when it was requested
+ai_move = None
+ai_started = 0
 
 while True:
 
@@ -108,15 +138,14 @@ while True:
         titleRect.center = ((width / 2), 30)
         screen.blit(title, titleRect)
 
-        # Check for AI move
+        # Check for AI move, waiting at least half a second so it is visible
         if user != player and not game_over:
-            if ai_turn:
-                time.sleep(0.5)
-                move = ttt.minimax(board)
-                board = ttt.result(board, move)
-                ai_turn = False
-            else:
-                ai_turn = True
+            if ai_move is None:
+                ai_move = think(board)
+                ai_started = time.time()
+            elif ai_move.done() and time.time() - ai_started >= 0.5:
+                board = ttt.result(board, ai_move.result())
+                ai_move = None
 
         # Check for a user move
         click, _, _ = pygame.mouse.get_pressed()
@@ -141,6 +170,6 @@ while True:
                     time.sleep(0.2)
                     user = None
                     board = ttt.initial_state()
-                    ai_turn = False
 
     pygame.display.flip()
+    clock.tick(60)
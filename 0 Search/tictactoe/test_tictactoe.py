@@ -0,0 +1,221 @@
+import functools
+
+import pytest
+
+from tictactoe import *
+
+
+@functools.lru_cache(maxsize=None)
+def value(cells):
+    """
+    Plain minimax value of a board given as a tuple of rows, without pruning.
+    """
+    board = [list(row) for row in cells]
+    if terminal(board):
+        return utility(board)
+    values = [value(tuple(map(tuple, result(board, action)))) for action in actions(board)]
+    return max(values) if player(board) == X else min(values)
+
+
+def reachable(board=None, seen=None):
+    """
+    Returns every board reachable from the initial state, as tuples of rows.
+    """
+    board = board or initial_state()
+    seen = set() if seen is None else seen
+    cells = tuple(map(tuple, board))
+    if cells not in seen:
+        seen.add(cells)
+        if not terminal(board):
+            for action in actions(board):
+                reachable(result(board, action), seen)
+    return seen
+
+
+POSITIONS = sorted(reachable(), key=lambda cells: str(cells))
+
+
+@pytest.mark.parametrize("board,expected", [
+    ([[X, X, X], [O, O, EMPTY], [EMPTY, EMPTY, EMPTY]], X),
+    ([[X, O, X], [X, O, EMPTY], [EMPTY, O, EMPTY]], O),
+    ([[X, O, EMPTY], [O, X, EMPTY], [EMPTY, EMPTY, X]], X),
+    ([[O, X, X], [X, X, O], [O, O, X]], None),
+])
+def test_winner(board, expected):
+    assert winner(board) == expected
+
+
+def test_canonical_symmetries():
+    board = [[X, O, EMPTY], [EMPTY, X, EMPTY], [EMPTY, EMPTY, EMPTY]]
+    rotated = [[EMPTY, EMPTY, X], [EMPTY, X, O], [EMPTY, EMPTY, EMPTY]]
+    reflected = [[EMPTY, O, X], [EMPTY, X, EMPTY], [EMPTY, EMPTY, EMPTY]]
+    other = [[X, EMPTY, O], [EMPTY, X, EMPTY], [EMPTY, EMPTY, EMPTY]]
+    assert canonical(board) == canonical(rotated) == canonical(reflected)
+    assert canonical(board) != canonical(other)
+
+
+def test_minimax_is_optimal():
+    for cells in POSITIONS:
+        board = [list(row) for row in cells]
+        action = minimax(board)
+        if terminal(board):
+            assert action is None
+        else:
+            assert value(tuple(map(tuple, result(board, action)))) == value(cells)
+
+
+def test_minimax_empty_board_node_count():
+    import tictactoe
+    tictactoe.transpositions.clear()
+    tictactoe.nodes_searched = 0
+    solve(initial_state())
+    assert tictactoe.nodes_searched < 200
+
+
+def test_solve_is_optimal():
+    for cells in POSITIONS[::5]:
+        board = [list(row) for row in cells]
+        action, v = solve(board)
+        assert v == value(cells)
+        if not terminal(board):
+            assert value(tuple(map(tuple, result(board, action)))) == value(cells)
+
+
+def test_book_covers_every_position():
+    import tictactoe
+    assert tictactoe.book is not None
+    for cells in POSITIONS:
+        board = [list(row) for row in cells]
+        entry = book_entry(board)
+        if terminal(board):
+            assert entry is None
+        else:
+            action, v = entry
+            assert v == value(cells)
+            assert value(tuple(map(tuple, result(board, action)))) == value(cells)
+
+
+def test_book_matches_generator():
+    import book
+    import tictactoe
+    saved = tictactoe.book
+    try:
+        assert book.generate() == tictactoe.BOOK_MAGIC + saved
+    finally:
+        tictactoe.book = saved
+
+
+def test_missing_book_falls_back_to_search(tmp_path):
+    import tictactoe
+    assert load_book(tmp_path / "book.bin") is None
+    (tmp_path / "book.bin").write_bytes(b"not a book")
+    assert load_book(tmp_path / "book.bin") is None
+    saved = tictactoe.book
+    try:
+        tictactoe.book = None
+        board = [[X, EMPTY, EMPTY], [EMPTY, O, EMPTY], [EMPTY, EMPTY, EMPTY]]
+        action = minimax(board)
+        assert value(tuple(map(tuple, result(board, action)))) == 0
+    finally:
+        tictactoe.book = saved
+
+
+def test_bitboard_api_matches():
+    import bitboard
+    for cells in POSITIONS:
+        board = [list(row) for row in cells]
+        bits = bitboard.Board.from_rows(cells)
+        assert [list(row) for row in bits] == board
+        assert bitboard.player(bits) == player(board)
+        assert bitboard.actions(bits) == actions(board)
+        assert bitboard.winner(bits) == winner(board)
+        assert bool(bitboard.terminal(bits)) == bool(terminal(board))
+        assert bitboard.utility(bits) == utility(board)
+        for action in actions(board):
+            assert bitboard.result(bits, action) == bitboard.Board.from_rows(result(board, action))
+
+
+def test_bitboard_minimax_is_optimal():
+    import bitboard
+    for cells in POSITIONS:
+        bits = bitboard.Board.from_rows(cells)
+        action = bitboard.minimax(bits)
+        if bitboard.terminal(bits):
+            assert action is None
+        else:
+            assert value(tuple(map(tuple, result([list(row) for row in cells], action)))) == value(cells)
+
+
+def test_mnk_3_3_3_is_optimal():
+    import mnk
+    game = mnk.Game(3, 3, 3)
+    for cells in POSITIONS[::7]:
+        board = [list(row) for row in cells]
+        assert game.terminal(board) == bool(terminal(board))
+        assert game.winner(board) == winner(board)
+        action = game.minimax(board, time_limit=None)
+        if terminal(board):
+            assert action is None
+        else:
+            assert value(tuple(map(tuple, result(board, action)))) == value(cells)
+
+
+@pytest.mark.parametrize("rows,cols,k,board,expected", [
+    # X to move wins on the top row
+    (4, 4, 4, [[X, X, X, EMPTY], [O, O, O, EMPTY], [EMPTY] * 4, [EMPTY] * 4], (0, 3)),
+    # O to move must block X's column
+    (4, 4, 4, [[X, O, EMPTY, EMPTY], [X, O, EMPTY, EMPTY], [X, EMPTY, EMPTY, EMPTY], [EMPTY] * 4], (3, 0)),
+    # Gomoku: X to move completes five
+    (15, 15, 5, [[X] * 4 + [EMPTY] * 11] + [[O] * 4 + [EMPTY] * 11] + [[EMPTY] * 15 for _ in range(13)], (0, 4)),
+])
+def test_mnk_tactics(rows, cols, k, board, expected):
+    import mnk
+    game = mnk.Game(rows, cols, k)
+    assert game.minimax(board, time_limit=2.0) == expected
+
+
+def test_mnk_deadline():
+    import time
+    import mnk
+    game = mnk.Game(4, 4, 4)
+    board = game.initial_state()
+    start = time.perf_counter()
+    action = game.minimax(board, time_limit=0.2)
+    assert time.perf_counter() - start < 0.4
+    assert action in game.actions(board)
+
+
+def test_mnk_parallel_matches_single_process():
+    import mnk
+    game = mnk.Game(4, 4, 4)
+    boards = [
+        game.initial_state(),
+        [[X, EMPTY, EMPTY, EMPTY], [EMPTY, O, EMPTY, EMPTY], [EMPTY] * 4, [EMPTY] * 4],
+        [[X, O, EMPTY, EMPTY], [EMPTY, X, EMPTY, EMPTY], [EMPTY, EMPTY, O, EMPTY], [EMPTY] * 4],
+    ]
+    for board in boards:
+        search = mnk.Search(game, board)
+        search.root(3)
+        assert mnk.parallel_root(game, board, 3, workers=2) == (search.action, search.value)
+
+    game = mnk.Game(3, 3, 3)
+    for cells in POSITIONS[::11]:
+        board = [list(row) for row in cells]
+        action = game.parallel_minimax(board, workers=2)
+        if terminal(board):
+            assert action is None
+        else:
+            assert value(tuple(map(tuple, result(board, action)))) == value(cells)
+
+
+def test_benchmark_perfect_play():
+    import benchmark
+    results = benchmark.run(list(benchmark.ENGINES), games=5)
+    assert results["ok"]
+    for engine in results["engines"].values():
+        assert engine["matches"][0]["draws"] == 1
+        assert engine["timing"]["moves"] > 0
+    book = results["engines"]["tictactoe"]["timing"]
+    assert book["book_hits"] == book["moves"]
+    assert book["nodes_per_second"] is None
+    assert results["engines"]["search"]["timing"]["nodes_per_second"] > 0
@@ -3,12 +3,78 @@ Tic Tac Toe Player
 """
 
 import math
-from copy import deepcopy
+import os
 
 X = "X"
 O = "O"
 EMPTY = None
 
+# The 8 rotations and reflections of the board, each as the cell (i, j)
+# that moves to position 3 * i + j
+SYMMETRIES = [
+    [transform(i, j) for i in range(3) for j in range(3)]
+    for transform in [
+        lambda i, j: (i, j),
+        lambda i, j: (j, 2 - i),
+        lambda i, j: (2 - i, 2 - j),
+        lambda i, j: (2 - j, i),
+        lambda i, j: (i, 2 - j),
+        lambda i, j: (2 - i, j),
+        lambda i, j: (j, i),
+        lambda i, j: (2 - j, 2 - i),
+    ]
+]
+
+# The 8 lines of three cells that win the game
+LINES = (
+    [[(i, j) for j in range(3)] for i in range(3)]
+    + [[(i, j) for i in range(3)] for j in range(3)]
+    + [[(i, i) for i in range(3)], [(i, 2 - i) for i in range(3)]]
+)
+
+# Move ordering: center, then corners, then edges
+PREFERENCE = {
+    (1, 1): 0,
+    (0, 0): 1, (0, 2): 1, (2, 0): 1, (2, 2): 1,
+    (0, 1): 2, (1, 0): 2, (1, 2): 2, (2, 1): 2,
+}
+
+# Transposition table flags: the stored value is exact, or only a bound
+EXACT, LOWER, UPPER = "exact", "lower", "upper"
+
+# Maps canonical board keys to (flag, value), kept across minimax calls
+transpositions = {}
+
+# Number of positions minimax has searched, for benchmarking
+nodes_searched = 0
+
+# Number of moves minimax has answered from the opening book, for benchmarking
+book_hits = 0
+
+# Opening book written by book.py: a magic header, then one byte per
+# canonical key, 0 if absent, otherwise 0x80 | (value + 1) << 4 | cell,
+# where cell is the best move's index in the canonical orientation
+BOOK_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "book.bin")
+BOOK_MAGIC = b"TTTBOOK1"
+BOOK_SIZE = 3 ** 9
+
+
+def load_book(path=BOOK_FILE):
+    """
+    Returns the opening book's entries, or None if it is missing or invalid.
+    """
+    try:
+        with open(path, "rb") as f:
+            data = f.read()
+    except OSError:
+        return None
+    if data[:len(BOOK_MAGIC)] != BOOK_MAGIC or len(data) != len(BOOK_MAGIC) + BOOK_SIZE:
+        return None
+    return data[len(BOOK_MAGIC):]
+
+
+book = load_book()
+
 
 def countXO(board):
     """
@@ -22,6 +88,96 @@ def countXO(board):
     return xCount, oCount
 
 
+def orientation(board):
+    """
+    Returns (key, symmetry) where key is the smallest base-3 encoding of
+    the board among its 8 rotations and reflections, and symmetry is the
+    index in SYMMETRIES of one that produces it.
+    """
+    digits = {EMPTY: 0, X: 1, O: 2}
+    keys = []
+    for index, symmetry in enumerate(SYMMETRIES):
+        key = 0
+        for i, j in symmetry:
+            key = key * 3 + digits[board[i][j]]
+        keys.append((key, index))
+    return min(keys)
+
+
+def canonical(board):
+    """
+    Returns an integer key for the board that is the same for all 8 of its
+    rotations and reflections: the smallest base-3 encoding among them.
+    """
+    return orientation(board)[0]
+
+
+def book_entry(board):
+    """
+    Returns (action, value) for the board from the opening book,
+    or None if the book is not loaded or has no entry for it.
+    """
+    if book is None:
+        return None
+    key, symmetry = orientation(board)
+    entry = book[key]
+    if not entry:
+        return None
+    return SYMMETRIES[symmetry][entry & 0x0F], (entry >> 4 & 0x03) - 1
+
+
+def encode_book_entry(board, action, value):
+    """
+    Returns (key, byte) storing action and value for the board in the book.
+    """
+    key, symmetry = orientation(board)
+    return key, 0x80 | (value + 1) << 4 | SYMMETRIES[symmetry].index(action)
+
+
+def completes_line(board, action, mark):
+    """
+    Returns True if playing mark at action would complete a line.
+    """
+    return any(
+        action in line and all(board[i][j] == mark for i, j in line if (i, j) != action)
+        for line in LINES
+    )
+
+
+def forcing_actions(board):
+    """
+    Returns the actions worth searching on a board, in order: a winning
+    move if there is one, otherwise the moves that block an immediate win
+    by the opponent if it has any, otherwise all moves.
+
+    Skipping the other moves never changes the minimax value: a win is
+    the best possible outcome, and not blocking loses on the next move.
+    """
+    options = sorted(actions(board), key=lambda action: PREFERENCE[action])
+    mover = player(board)
+    opponent = O if mover == X else X
+    for action in options:
+        if completes_line(board, action, mover):
+            return [action]
+    blocks = [action for action in options if completes_line(board, action, opponent)]
+    return blocks or options
+
+
+def distinct_children(board):
+    """
+    Yields (action, new board, canonical key) for the forcing actions from
+    board, skipping moves that lead to a rotation or reflection of an
+    earlier one.
+    """
+    seen = set()
+    for action in forcing_actions(board):
+        new_board = result(board, action)
+        key = canonical(new_board)
+        if key not in seen:
+            seen.add(key)
+            yield action, new_board, key
+
+
 def initial_state():
     """
     Returns starting state of the board.
@@ -56,7 +212,7 @@ def result(board, action):
 
     if board[i][j] is not EMPTY: raise Exception(f'Invalid action {action} on board: {board}')
 
-    new_board = deepcopy(board)
+    new_board = [row[:] for row in board]
     new_board[i][j] = player(board)
     return new_board
     
@@ -113,56 +269,109 @@ def minimax(board):
     """
     Returns the optimal action for the current player on the board.
     """
+    if terminal(board): return None
+
+    entry = book_entry(board)
+    if entry is not None:
+        global book_hits
+        book_hits += 1
+        return entry[0]
+    return solve(board)[0]
 
-    def max_value(board, alpha, beta):
+
+def solve(board):
+    """
+    Searches the board, returning (optimal action, minimax value).
+    """
+
+    def lookup(key, alpha, beta):
+        """
+        Returns (value, alpha, beta) from the transposition table, where
+        value is not None if the stored entry settles the position.
+        """
+        entry = transpositions.get(key)
+        if entry is None:
+            return None, alpha, beta
+        flag, value = entry
+        if flag == EXACT:
+            return value, alpha, beta
+        elif flag == LOWER:
+            alpha = max(alpha, value)
+        elif flag == UPPER:
+            beta = min(beta, value)
+        if alpha >= beta:
+            return value, alpha, beta
+        return None, alpha, beta
+
+    def store(key, v, alpha, beta):
+        """
+        Stores v for the position key, searched with window (alpha, beta).
+        """
+        if v <= alpha:
+            flag = UPPER
+        elif v >= beta:
+            flag = LOWER
+        else:
+            flag = EXACT
+        transpositions[key] = (flag, v)
+
+    def max_value(board, alpha, beta, key):
+        global nodes_searched
+        nodes_searched += 1
         if terminal(board): return utility(board)
-        # print(f'\nmax_value() : {board=}')
+        value, alpha, beta = lookup(key, alpha, beta)
+        if value is not None: return value
+        alpha_original = alpha
         v = float('-inf')
-        for action in actions(board):
-            # print(f'max_value() : {action=}')
-            board_new = result(board, action)       #;print(f'max_value() : {board_new=}')
-            min_val = min_value(board_new, alpha, beta)          #;print(f'max_value() : {min_val=}')
+        for _, board_new, key_new in distinct_children(board):
+            min_val = min_value(board_new, alpha, beta, key_new)
             v = max(v, min_val)
             alpha = max(alpha, v)
             if beta <= alpha:
                 break
+        store(key, v, alpha_original, beta)
         return v
 
-    def min_value(board, alpha, beta):
+    def min_value(board, alpha, beta, key):
+        global nodes_searched
+        nodes_searched += 1
         if terminal(board): return utility(board)
-        # print(f'\nmin_value() : {board=}')
+        value, alpha, beta = lookup(key, alpha, beta)
+        if value is not None: return value
+        beta_original = beta
         v = float('inf')
-        for action in actions(board):
-            # print(f'min_value() : {action=}')
-            board_new = result(board, action)       #;print(f'min_value() : {board_new=}')
-            max_val = max_value(board_new, alpha, beta)          #;print(f'min_value() : {max_val=}')
+        for _, board_new, key_new in distinct_children(board):
+            max_val = max_value(board_new, alpha, beta, key_new)
             v = min(v, max_val)
             beta = min(beta, v)
             if beta <= alpha:
                 break
+        store(key, v, alpha, beta_original)
         return v
 
 
-    if terminal(board): return None
+    if terminal(board): return None, utility(board)
 
     currentPlayer = player(board) 
     optimal_action = None
     inf_neg = float('-inf')
     inf_pos = float('inf')
-    
+
+    # Root moves after the first are searched against the best value so
+    # far, so only strictly better moves come back as exact values
     if currentPlayer == X: 
         v = inf_neg
-        for action in actions(board):
-            min_val = min_value(result(board, action), inf_neg, inf_pos)
+        for action, board_new, key in distinct_children(board):
+            min_val = min_value(board_new, v, inf_pos, key)
             if min_val > v:
                 v = min_val
                 optimal_action = action
     elif currentPlayer == O:
         v = inf_pos
-        for action in actions(board):
-            max_val = max_value(result(board, action), inf_neg, inf_pos)
+        for action, board_new, key in distinct_children(board):
+            max_val = max_value(board_new, inf_neg, v, key)
             if max_val < v:
                 v = max_val
                 optimal_action = action
     
-    return optimal_action
+    return optimal_action, v
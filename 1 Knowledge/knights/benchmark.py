@@ -0,0 +1,124 @@
+"""
+Benchmarks for evaluating logical sentences on many models.
+
+Compares Sentence.evaluate against compiled functions taking positional
+truth values or a bitmask, and against one bit-parallel truth table.
+
+Usage: python benchmark.py puzzles
+       python benchmark.py cnf [symbols] [models]
+"""
+
+import random
+import sys
+import time
+
+import puzzle
+from logic import *
+
+
+def bench_evaluators(sentence, names, masks):
+    """
+    Evaluates sentence on each model in masks (bit i being names[i]) every
+    way there is. Returns (evaluator name, models per second) pairs, and
+    checks that every way agrees.
+    """
+    results = []
+    expected = None
+
+    def record(name, count, elapsed, values):
+        nonlocal expected
+        if expected is None:
+            expected = values
+        elif values != expected:
+            raise Exception(f"{name} disagrees with evaluate")
+        results.append((name, count / elapsed))
+
+    models = [{name: bool(mask >> i & 1) for i, name in enumerate(names)} for mask in masks]
+    start = time.perf_counter()
+    values = [sentence.evaluate(model) for model in models]
+    record("evaluate", len(masks), time.perf_counter() - start, values)
+
+    positional = [[bool(mask >> i & 1) for i in range(len(names))] for mask in masks]
+    function = sentence.compile(names)
+    start = time.perf_counter()
+    values = [function(*model) for model in positional]
+    record("compiled, positional", len(masks), time.perf_counter() - start, values)
+
+    function = sentence.compile(names, bitmask=True)
+    start = time.perf_counter()
+    values = [function(mask) for mask in masks]
+    record("compiled, bitmask", len(masks), time.perf_counter() - start, values)
+
+    # Truth tables only make sense over every model at once
+    if len(masks) == 2 ** len(names):
+        columns, mask = truth_columns(len(names))
+        start = time.perf_counter()
+        table = truth_table(sentence, dict(zip(names, columns)), mask)
+        elapsed = time.perf_counter() - start
+        record("truth table", len(masks), elapsed, [bool(table >> m & 1) for m in masks])
+
+    return results
+
+
+def report(label, results):
+    print(label)
+    for name, rate in results:
+        print(f"{name:>24}: {rate:,.0f} models/s")
+
+
+def puzzles(args):
+    """
+    Evaluates each knights puzzle's knowledge on every model.
+    """
+    for number, knowledge in enumerate([puzzle.knowledge0, puzzle.knowledge1,
+                                        puzzle.knowledge2, puzzle.knowledge3]):
+        names = sorted(knowledge.symbols())
+        masks = list(range(2 ** len(names))) * (2 ** 14 // 2 ** len(names))
+        report(f"Puzzle {number} ({len(names)} symbols, {len(masks)} evaluations)",
+               bench_evaluators(knowledge, names, masks))
+
+
+def random_cnf(count, clauses, rng):
+    """
+    Returns a random 3-CNF sentence over count symbols.
+    """
+    symbols = [Symbol(f"p{i}") for i in range(count)]
+    return And(*[
+        Or(*[symbol if rng.random() < 0.5 else Not(symbol)
+             for symbol in rng.sample(symbols, 3)])
+        for _ in range(clauses)
+    ])
+
+
+def cnf(args):
+    """
+    Evaluates random 3-CNF formulas, at the ratio of clauses to symbols
+    where they are hardest to satisfy, on every model or random ones.
+    """
+    count = int(args[0]) if len(args) > 0 else 14
+    samples = int(args[1]) if len(args) > 1 else 2 ** 14
+    rng = random.Random(0)
+    sentence = random_cnf(count, round(4.26 * count), rng)
+    names = [f"p{i}" for i in range(count)]
+    if samples >= 2 ** count:
+        masks = list(range(2 ** count))
+    else:
+        masks = [rng.getrandbits(count) for _ in range(samples)]
+    report(f"3-CNF ({count} symbols, {len(sentence.conjuncts)} clauses, {len(masks)} models)",
+           bench_evaluators(sentence, names, masks))
+
+
+BENCHMARKS = {
+    "puzzles": puzzles,
+    "cnf": cnf,
+}
+
+
+def main():
+    if len(sys.argv) < 2 or sys.argv[1] not in BENCHMARKS:
+        sys.exit(f"Usage: python benchmark.py [{'|'.join(BENCHMARKS)}] [args...]")
+    BENCHMARKS[sys.argv[1]](sys.argv[2:])
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,118 @@
+"""
+Immutable, hash-consed logical sentences.
+
+The classes here take the same arguments as those in logic.py and work
+anywhere they do, but constructing a sentence equal to one that already
+exists returns that same object, so identical subformulas are stored once.
+Sentences cannot be changed after construction, which lets each one
+compute its hash and its set of symbols once, when it is created.
+"""
+
+import weakref
+
+import logic
+
+# Every live interned sentence, by its class and constructor arguments
+_table = weakref.WeakValueDictionary()
+
+# One shared frozenset per distinct set of symbols
+_symbol_sets = weakref.WeakValueDictionary()
+
+
+class Interned():
+    """
+    Mixin that interns and freezes a logic.Sentence subclass.
+    """
+
+    # Attribute holding the list of parts, if any
+    _parts = None
+
+    def __new__(cls, *args):
+        args = tuple(intern(arg) if isinstance(arg, logic.Sentence) else arg for arg in args)
+        sentence = _table.get((cls,) + args)
+        if sentence is None:
+            sentence = super().__new__(cls)
+            _table[(cls,) + args] = sentence
+        return sentence
+
+    def __init__(self, *args):
+        # __init__ runs again whenever an existing sentence is returned
+        if "_hash" in self.__dict__:
+            return
+        args = tuple(intern(arg) if isinstance(arg, logic.Sentence) else arg for arg in args)
+        super().__init__(*args)
+
+        # And and Or keep their parts in a list, which could be changed
+        if self._parts is not None:
+            self.__dict__[self._parts] = args
+        self._args = args
+        symbols = frozenset(super().symbols())
+        self._symbols = _symbol_sets.setdefault(symbols, symbols)
+        self._hash = super().__hash__()
+
+    def __setattr__(self, name, value):
+        if "_hash" in self.__dict__:
+            raise AttributeError(f"{type(self).__name__} is immutable")
+        super().__setattr__(name, value)
+
+    def __eq__(self, other):
+        if isinstance(other, Interned):
+            return self is other
+        return super().__eq__(other)
+
+    def __hash__(self):
+        return self._hash
+
+    def __reduce__(self):
+        return type(self), self._args
+
+    def symbols(self):
+        return self._symbols
+
+
+class Symbol(Interned, logic.Symbol):
+    pass
+
+
+class Not(Interned, logic.Not):
+    pass
+
+
+class And(Interned, logic.And):
+    _parts = "conjuncts"
+
+    def add(self, conjunct):
+        raise TypeError("interned sentences are immutable; build a new And instead")
+
+
+class Or(Interned, logic.Or):
+    _parts = "disjuncts"
+
+
+class Implication(Interned, logic.Implication):
+    pass
+
+
+class Biconditional(Interned, logic.Biconditional):
+    pass
+
+
+def intern(sentence):
+    """
+    Returns the interned sentence equal to a logic.Sentence.
+    """
+    if isinstance(sentence, Interned):
+        return sentence
+    if isinstance(sentence, logic.Symbol):
+        return Symbol(sentence.name)
+    if isinstance(sentence, logic.Not):
+        return Not(sentence.operand)
+    if isinstance(sentence, logic.And):
+        return And(*sentence.conjuncts)
+    if isinstance(sentence, logic.Or):
+        return Or(*sentence.disjuncts)
+    if isinstance(sentence, logic.Implication):
+        return Implication(sentence.antecedent, sentence.consequent)
+    if isinstance(sentence, logic.Biconditional):
+        return Biconditional(sentence.left, sentence.right)
+    raise TypeError("must be a logical sentence")
@@ -1,5 +1,23 @@
+import functools
 import itertools
 
+from sat import Solver
+
+# model_check evaluates truth tables for up to this many symbols, beyond
+# which the solver is usually faster
+TRUTH_TABLE_SYMBOLS = 16
+
+# Truth tables cover the models of this many symbols at a time, each
+# symbol beyond them being fixed in turn to every combination of values.
+# A block is one 2 ** 16-bit int, whose &, | and ^ already run word by word
+# in C, so numpy uint64 arrays would add an import to knights (which
+# otherwise needs only the standard library) for no measurable gain
+BLOCK_SYMBOLS = 16
+
+# Compiled expressions nested deeper than this are split into statements,
+# keeping them within the limits of Python's parser
+MAX_NESTING = 40
+
 
 class Sentence():
 
@@ -15,6 +33,10 @@ class Sentence():
         """Returns a set of all symbols in the logical sentence."""
         return set()
 
+    def compile(self, names=None, bitmask=False):
+        """Returns a Python function evaluating the logical sentence."""
+        return compile_sentence(self, names, bitmask)
+
     @classmethod
     def validate(cls, sentence):
         if not isinstance(sentence, Sentence):
@@ -100,7 +122,7 @@ class And(Sentence):
         self.conjuncts = list(conjuncts)
 
     def __eq__(self, other):
-        return isinstance(other, And) and self.conjuncts == other.conjuncts
+        return isinstance(other, And) and tuple(self.conjuncts) == tuple(other.conjuncts)
 
     def __hash__(self):
         return hash(
@@ -127,7 +149,7 @@ class And(Sentence):
                            for conjunct in self.conjuncts])
 
     def symbols(self):
-        return set.union(*[conjunct.symbols() for conjunct in self.conjuncts])
+        return set().union(*[conjunct.symbols() for conjunct in self.conjuncts])
 
 
 class Or(Sentence):
@@ -137,7 +159,7 @@ class Or(Sentence):
         self.disjuncts = list(disjuncts)
 
     def __eq__(self, other):
-        return isinstance(other, Or) and self.disjuncts == other.disjuncts
+        return isinstance(other, Or) and tuple(self.disjuncts) == tuple(other.disjuncts)
 
     def __hash__(self):
         return hash(
@@ -158,7 +180,7 @@ class Or(Sentence):
                             for disjunct in self.disjuncts])
 
     def symbols(self):
-        return set.union(*[disjunct.symbols() for disjunct in self.disjuncts])
+        return set().union(*[disjunct.symbols() for disjunct in self.disjuncts])
 
 
 class Implication(Sentence):
@@ -189,7 +211,7 @@ class Implication(Sentence):
         return f"{antecedent} => {consequent}"
 
     def symbols(self):
-        return set.union(self.antecedent.symbols(), self.consequent.symbols())
+        return set().union(self.antecedent.symbols(), self.consequent.symbols())
 
 
 class Biconditional(Sentence):
@@ -217,16 +239,419 @@ class Biconditional(Sentence):
                     and not self.right.evaluate(model)))
 
     def formula(self):
-        left = Sentence.parenthesize(str(self.left))
-        right = Sentence.parenthesize(str(self.right))
+        left = Sentence.parenthesize(self.left.formula())
+        right = Sentence.parenthesize(self.right.formula())
         return f"{left} <=> {right}"
 
     def symbols(self):
-        return set.union(self.left.symbols(), self.right.symbols())
+        return set().union(self.left.symbols(), self.right.symbols())
+
+
+# Tokens of the formula syntax, with ASCII alternatives
+OPERATORS = {
+    "¬": "not", "~": "not",
+    "∧": "and", "&": "and",
+    "∨": "or", "|": "or",
+    "=>": "implies",
+    "<=>": "iff",
+    "(": "(",
+    ")": ")",
+}
+
+
+def tokenize(formula):
+    """
+    Returns the tokens of formula: the names of OPERATORS, and ("symbol",
+    name) for each symbol name, which may contain spaces.
+    """
+    tokens = []
+    name = []
+
+    def end_name():
+        if "".join(name).strip():
+            tokens.append(("symbol", "".join(name).strip()))
+        name.clear()
+
+    i = 0
+    while i < len(formula):
+        for operator in ["<=>", "=>", "¬", "~", "∧", "&", "∨", "|", "(", ")"]:
+            if formula.startswith(operator, i):
+                end_name()
+                tokens.append(OPERATORS[operator])
+                i += len(operator)
+                break
+        else:
+            name.append(formula[i])
+            i += 1
+    end_name()
+    return tokens
+
+
+def parse(formula):
+    """
+    Returns the sentence written as formula, in the syntax of
+    Sentence.formula(). Binds tightest to loosest: ¬, ∧, ∨, =>, <=>.
+    """
+    tokens = tokenize(formula)
+    position = 0
+
+    def peek():
+        return tokens[position] if position < len(tokens) else None
+
+    def expect(token):
+        nonlocal position
+        if peek() != token:
+            found = "end of formula" if peek() is None else repr(peek())
+            raise ValueError(f"expected {token!r} but found {found} in {formula!r}")
+        position += 1
+
+    def biconditional():
+        nonlocal position
+        left = implication()
+        while peek() == "iff":
+            position += 1
+            left = Biconditional(left, implication())
+        return left
+
+    def implication():
+        nonlocal position
+        antecedent = disjunction()
+        if peek() == "implies":
+            position += 1
+            return Implication(antecedent, implication())
+        return antecedent
+
+    def disjunction():
+        nonlocal position
+        disjuncts = [conjunction()]
+        while peek() == "or":
+            position += 1
+            disjuncts.append(conjunction())
+        return disjuncts[0] if len(disjuncts) == 1 else Or(*disjuncts)
+
+    def conjunction():
+        nonlocal position
+        conjuncts = [negation()]
+        while peek() == "and":
+            position += 1
+            conjuncts.append(negation())
+        return conjuncts[0] if len(conjuncts) == 1 else And(*conjuncts)
+
+    def negation():
+        nonlocal position
+        token = peek()
+        if token == "not":
+            position += 1
+            return Not(negation())
+        if token == "(":
+            position += 1
+            sentence = biconditional()
+            expect(")")
+            return sentence
+        if isinstance(token, tuple):
+            position += 1
+            return Symbol(token[1])
+        found = "end of formula" if token is None else repr(token)
+        raise ValueError(f"expected a sentence but found {found} in {formula!r}")
+
+    sentence = biconditional()
+    expect(None)
+    return sentence
+
+
+class CNF():
+    """
+    Sentences converted to clauses over integer variables for sat.Solver.
+
+    Each symbol gets a variable, and so does each compound subsentence not
+    asserted directly (the Tseitin transformation), together with clauses
+    making it equivalent to its parts. That keeps the clauses linear in the
+    size of the sentences, where distributing Or over And can blow up.
+    """
+
+    def __init__(self):
+        self.clauses = []
+        self.variables = {}
+        self.count = 0
+        self.definitions = {}
+
+    def variable(self, name):
+        """Returns the variable for the symbol called name."""
+        if name not in self.variables:
+            self.count += 1
+            self.variables[name] = self.count
+        return self.variables[name]
+
+    def fresh(self):
+        """Returns a new variable that no symbol uses."""
+        self.count += 1
+        return self.count
+
+    def literal(self, sentence):
+        """Returns a literal equivalent to sentence, defining it if needed."""
+        if isinstance(sentence, Symbol):
+            return self.variable(sentence.name)
+        if isinstance(sentence, Not):
+            return -self.literal(sentence.operand)
+        if isinstance(sentence, (And, Or)):
+            parts = sentence.conjuncts if isinstance(sentence, And) else sentence.disjuncts
+            if len(parts) == 1:
+                return self.literal(parts[0])
+        if sentence in self.definitions:
+            return self.definitions[sentence]
+
+        v = self.fresh()
+        if isinstance(sentence, And):
+            literals = [self.literal(conjunct) for conjunct in sentence.conjuncts]
+            for literal in literals:
+                self.clauses.append([-v, literal])
+            self.clauses.append([v] + [-literal for literal in literals])
+        elif isinstance(sentence, Or):
+            literals = [self.literal(disjunct) for disjunct in sentence.disjuncts]
+            for literal in literals:
+                self.clauses.append([v, -literal])
+            self.clauses.append([-v] + literals)
+        elif isinstance(sentence, Implication):
+            a = self.literal(sentence.antecedent)
+            b = self.literal(sentence.consequent)
+            self.clauses.extend([[-v, -a, b], [v, a], [v, -b]])
+        elif isinstance(sentence, Biconditional):
+            a = self.literal(sentence.left)
+            b = self.literal(sentence.right)
+            self.clauses.extend([[-v, -a, b], [-v, a, -b], [v, a, b], [v, -a, -b]])
+        else:
+            raise TypeError(f"cannot convert {sentence!r} to CNF")
+        self.definitions[sentence] = v
+        return v
+
+    def add(self, sentence):
+        """Adds clauses asserting sentence."""
+        if isinstance(sentence, And):
+            for conjunct in sentence.conjuncts:
+                self.add(conjunct)
+        elif isinstance(sentence, Or):
+            self.clauses.append([self.literal(disjunct) for disjunct in sentence.disjuncts])
+        elif isinstance(sentence, Implication):
+            self.clauses.append([-self.literal(sentence.antecedent),
+                                 self.literal(sentence.consequent)])
+        elif isinstance(sentence, Biconditional):
+            a = self.literal(sentence.left)
+            b = self.literal(sentence.right)
+            self.clauses.extend([[-a, b], [a, -b]])
+        else:
+            self.clauses.append([self.literal(sentence)])
+
+
+def to_cnf(sentence):
+    """Returns a CNF whose clauses are satisfiable exactly when sentence is."""
+    cnf = CNF()
+    cnf.add(sentence)
+    return cnf
+
+
+class KnowledgeBase():
+    """
+    Knowledge converted to clauses once, in a solver kept between queries.
+
+    Each query is one solve of the same clauses under the assumption that
+    the query is false. Models found along the way are kept, and a query
+    false in one of them is answered without solving at all.
+    """
+
+    def __init__(self, *sentences):
+        self.cnf = CNF()
+        self.solver = Solver()
+        self.given = 0
+        self.models = []
+        for sentence in sentences:
+            self.add(sentence)
+
+    def add(self, sentence):
+        """Adds sentence to the knowledge."""
+        self.cnf.add(sentence)
+        self.sync()
+        self.models = []
+
+    def sync(self):
+        """Gives the solver any clauses the CNF has gained since last time."""
+        for clause in self.cnf.clauses[self.given:]:
+            self.solver.add_clause(clause)
+        self.given = len(self.cnf.clauses)
+
+    def satisfiable(self):
+        """Checks if the knowledge is consistent."""
+        return self.solve([])
+
+    def entails(self, query):
+        """Checks if the knowledge entails query."""
+        literal = self.cnf.literal(query)
+        self.sync()
+        for model in self.models:
+            if model.get(abs(literal)) == (literal < 0):
+                return False
+        return not self.solve([-literal])
+
+    def solve(self, assumptions):
+        """Solves under assumptions, keeping the model if there is one."""
+        if self.solver.solve(assumptions):
+            self.models.append(self.solver.model)
+            return True
+        return False
+
+
+def compile_sentence(sentence, names=None, bitmask=False):
+    """
+    Returns a generated Python function that evaluates sentence in one call.
+
+    names lists the symbols in argument order, by default sorted. The
+    function takes one truth value per name, or, if bitmask is True, a
+    single int in which bit i is the value of names[i].
+    """
+    names = sorted(sentence.symbols()) if names is None else list(names)
+    if bitmask:
+        refer = {name: f"(m >> {i} & 1)" for i, name in enumerate(names)}
+        parameters = "m"
+    else:
+        refer = {name: f"v{i}" for i, name in enumerate(names)}
+        parameters = ", ".join(refer.values())
+
+    # Subexpressions that would nest too deeply, computed beforehand
+    lines = []
+    shared = {}
+
+    def expression(sentence, depth):
+        if isinstance(sentence, Symbol):
+            try:
+                return refer[sentence.name]
+            except KeyError:
+                raise Exception(f"variable {sentence.name} not in names")
+        if depth >= MAX_NESTING:
+            if id(sentence) not in shared:
+                value = expression(sentence, 0)
+                shared[id(sentence)] = f"t{len(shared)}"
+                lines.append(f"    {shared[id(sentence)]} = {value}")
+            return shared[id(sentence)]
+        depth += 1
+        if isinstance(sentence, Not):
+            return f"(not {expression(sentence.operand, depth)})"
+        if isinstance(sentence, And):
+            parts = [expression(conjunct, depth) for conjunct in sentence.conjuncts]
+            return f"({' and '.join(parts)})" if parts else "True"
+        if isinstance(sentence, Or):
+            parts = [expression(disjunct, depth) for disjunct in sentence.disjuncts]
+            return f"({' or '.join(parts)})" if parts else "False"
+        if isinstance(sentence, Implication):
+            antecedent = expression(sentence.antecedent, depth)
+            consequent = expression(sentence.consequent, depth)
+            return f"(not {antecedent} or {consequent})"
+        if isinstance(sentence, Biconditional):
+            left = expression(sentence.left, depth)
+            right = expression(sentence.right, depth)
+            return f"((not {left}) == (not {right}))"
+        raise TypeError(f"cannot compile {sentence!r}")
+
+    body = expression(sentence, 0)
+    source = "\n".join([f"def evaluate({parameters}):"] + lines
+                       + [f"    return bool({body})"])
+    namespace = {}
+    exec(source, namespace)
+    return namespace["evaluate"]
+
+
+@functools.lru_cache(maxsize=None)
+def truth_columns(count):
+    """
+    Returns (columns, mask) for count symbols, where bit m of the int
+    columns[i] is whether symbol i is true in model m, and mask has all
+    2 ** count bits set.
+    """
+    size = 1 << count
+    columns = []
+    for i in range(count):
+        # Runs of 2 ** i false models then 2 ** i true ones, doubled up
+        # until they cover every model
+        run = 1 << i
+        column = ((1 << run) - 1) << run
+        width = 2 * run
+        while width < size:
+            column |= column << width
+            width *= 2
+        columns.append(column)
+    return columns, (1 << size) - 1
+
+
+def truth_table(sentence, columns, mask):
+    """
+    Returns an int whose set bits are the models in which sentence is true,
+    given the truth table of each symbol by name in columns.
+    """
+    if isinstance(sentence, Symbol):
+        return columns[sentence.name]
+    if isinstance(sentence, Not):
+        return mask ^ truth_table(sentence.operand, columns, mask)
+    if isinstance(sentence, And):
+        table = mask
+        for conjunct in sentence.conjuncts:
+            table &= truth_table(conjunct, columns, mask)
+        return table
+    if isinstance(sentence, Or):
+        table = 0
+        for disjunct in sentence.disjuncts:
+            table |= truth_table(disjunct, columns, mask)
+        return table
+    if isinstance(sentence, Implication):
+        return ((mask ^ truth_table(sentence.antecedent, columns, mask))
+                | truth_table(sentence.consequent, columns, mask))
+    if isinstance(sentence, Biconditional):
+        return mask ^ (truth_table(sentence.left, columns, mask)
+                       ^ truth_table(sentence.right, columns, mask))
+    raise TypeError(f"cannot evaluate {sentence!r}")
+
+
+def truth_blocks(names, assigned=None):
+    """
+    Yields (columns, mask) for each block of the models of names, as taken
+    by truth_table, with any symbols in assigned fixed to their given values.
+    """
+    low, high = names[:BLOCK_SYMBOLS], names[BLOCK_SYMBOLS:]
+    bits, mask = truth_columns(len(low))
+    columns = dict(zip(low, bits))
+    for name, value in (assigned or {}).items():
+        columns[name] = mask if value else 0
+    for values in itertools.product([mask, 0], repeat=len(high)):
+        columns.update(zip(high, values))
+        yield columns, mask
+
+
+def model_check_truth_table(knowledge, query):
+    """
+    Checks if knowledge base entails query by evaluating both on every
+    model at once, with each model a bit of an int.
+    """
+    names = sorted(set().union(knowledge.symbols(), query.symbols()))
+    for columns, mask in truth_blocks(names):
+        counterexamples = (truth_table(knowledge, columns, mask)
+                           & (mask ^ truth_table(query, columns, mask)))
+        if counterexamples:
+            return False
+    return True
 
 
 def model_check(knowledge, query):
     """Checks if knowledge base entails query."""
+    symbols = set().union(knowledge.symbols(), query.symbols())
+    if len(symbols) <= TRUTH_TABLE_SYMBOLS:
+        return model_check_truth_table(knowledge, query)
+
+    # Knowledge entails query exactly when knowledge and not query
+    # cannot both be true
+    cnf = to_cnf(knowledge)
+    cnf.add(Not(query))
+    return not Solver(cnf.clauses).solve()
+
+
+def model_check_enumerate(knowledge, query):
+    """Checks if knowledge base entails query by enumerating every model."""
 
     def check_all(knowledge, query, symbols, model):
         """Checks if knowledge base entails query, given a particular model."""
@@ -257,7 +682,7 @@ def model_check(knowledge, query):
                     check_all(knowledge, query, remaining, model_false))
 
     # Get all symbols in both knowledge and query
-    symbols = set.union(knowledge.symbols(), query.symbols())
+    symbols = set().union(knowledge.symbols(), query.symbols())
 
     # Check that knowledge entails query
     return check_all(knowledge, query, symbols, dict())
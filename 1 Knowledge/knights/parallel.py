@@ -0,0 +1,103 @@
+"""
+Exhaustive model checking and model counting across processes.
+
+The models are split by fixing the first few symbols every possible way,
+and each of those subproblems is checked by a worker process with the
+bit-parallel truth tables of logic.py. Entailment stops every worker as
+soon as any of them finds a counterexample.
+"""
+
+import math
+import os
+from contextlib import closing
+from multiprocessing import Event, Pool
+
+from logic import truth_blocks, truth_table
+
+# This worker's (sentences, fixed names, other names, stop event)
+_problem = None
+
+
+def attach(sentences, fixed, rest, stop):
+    """
+    Pool initializer: sets up this worker to check the given problem.
+    """
+    global _problem
+    _problem = (sentences, fixed, rest, stop)
+
+
+def assignment(fixed, prefix):
+    """
+    Returns the values of the fixed symbols in subproblem prefix, whose
+    bit i is the value of fixed[i].
+    """
+    return {name: bool(prefix >> i & 1) for i, name in enumerate(fixed)}
+
+
+def check(prefix):
+    """
+    Pool task: returns False if subproblem prefix has a model of the
+    knowledge in which the query is false, or None if checking was stopped
+    early because some worker already found one, otherwise True.
+    """
+    (knowledge, query), fixed, rest, stop = _problem
+    for columns, mask in truth_blocks(rest, assignment(fixed, prefix)):
+        if stop.is_set():
+            return None
+        if truth_table(knowledge, columns, mask) & (mask ^ truth_table(query, columns, mask)):
+            stop.set()
+            return False
+    return True
+
+
+def count(prefix):
+    """
+    Pool task: returns the number of models of the knowledge in subproblem prefix.
+    """
+    (knowledge,), fixed, rest, stop = _problem
+    return sum(bin(truth_table(knowledge, columns, mask)).count("1")
+               for columns, mask in truth_blocks(rest, assignment(fixed, prefix)))
+
+
+def run(task, sentences, names, workers=None, split=None):
+    """
+    Yields the result of task on each subproblem of the models of names,
+    in whatever order they finish, splitting on the first split symbols
+    (by default enough for a few subproblems per worker).
+    """
+    workers = workers or os.cpu_count() or 1
+    if split is None:
+        split = math.ceil(math.log2(4 * workers)) if workers > 1 else 0
+    split = min(split, len(names))
+    fixed, rest = names[:split], names[split:]
+    stop = Event()
+    prefixes = range(2 ** split)
+
+    if workers == 1:
+        attach(sentences, fixed, rest, stop)
+        yield from map(task, prefixes)
+        return
+    with Pool(workers, initializer=attach, initargs=(sentences, fixed, rest, stop)) as pool:
+        yield from pool.imap_unordered(task, prefixes)
+
+
+def model_check_parallel(knowledge, query, workers=None, split=None):
+    """
+    Checks if knowledge base entails query, checking every model across
+    workers processes (by default one per CPU).
+    """
+    names = sorted(set().union(knowledge.symbols(), query.symbols()))
+    with closing(run(check, (knowledge, query), names, workers, split)) as results:
+        for result in results:
+            if result is False:
+                return False
+    return True
+
+
+def count_models(knowledge, workers=None, split=None, symbols=()):
+    """
+    Returns the number of models of the knowledge base's symbols, and of
+    any other symbol names given, in which it is true.
+    """
+    names = sorted(set().union(knowledge.symbols(), symbols))
+    return sum(run(count, (knowledge,), names, workers, split))
@@ -77,8 +77,9 @@ def main():
         if len(knowledge.conjuncts) == 0:
             print("    Not yet implemented.")
         else:
+            kb = KnowledgeBase(knowledge)
             for symbol in symbols:
-                if model_check(knowledge, symbol):
+                if kb.entails(symbol):
                     print(f"    {symbol}")
 
 
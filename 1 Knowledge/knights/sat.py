@@ -0,0 +1,191 @@
+"""
+A small DPLL SAT solver.
+
+Clauses are lists of nonzero ints in the DIMACS convention: v means that
+variable v is true and -v that it is false. Propagation uses two watched
+literals per clause, so assigning a literal only visits the clauses that
+watch its negation. Clauses can be added between calls to solve, and each
+call can be given assumptions: literals that must hold for that call only.
+"""
+
+
+class Solver():
+
+    def __init__(self, clauses=()):
+        # Clauses of two or more literals, each watched by its first two
+        self.clauses = []
+        self.watches = {}
+        self.units = []
+        self.inconsistent = False
+        self.variables = 0
+        self.occurrences = {}
+        self.order = None
+
+        # Current partial assignment, by literal, in the order it was made
+        self.values = {}
+        self.trail = []
+        self.head = 0
+
+        # Satisfying assignment from the last successful solve
+        self.model = None
+
+        for clause in clauses:
+            self.add_clause(clause)
+
+    def add_clause(self, clause):
+        """
+        Adds a clause, given as an iterable of literals.
+        """
+        literals = []
+        tautology = False
+        for literal in clause:
+            self.variables = max(self.variables, abs(literal))
+            if -literal in literals:
+                tautology = True
+            elif literal not in literals:
+                literals.append(literal)
+        self.order = None
+        if tautology:
+            return
+        for literal in literals:
+            self.occurrences[abs(literal)] = self.occurrences.get(abs(literal), 0) + 1
+
+        if not literals:
+            self.inconsistent = True
+        elif len(literals) == 1:
+            self.units.append(literals[0])
+        else:
+            self.clauses.append(literals)
+            self.watches.setdefault(literals[0], []).append(literals)
+            self.watches.setdefault(literals[1], []).append(literals)
+
+    def value(self, literal):
+        """
+        Returns True or False if literal is assigned, otherwise None.
+        """
+        return self.values.get(literal)
+
+    def assign(self, literal):
+        """
+        Makes literal true. Returns False if it is already false.
+        """
+        value = self.values.get(literal)
+        if value is not None:
+            return value
+        self.values[literal] = True
+        self.values[-literal] = False
+        self.trail.append(literal)
+        return True
+
+    def undo(self, length):
+        """
+        Unassigns everything after the first length literals of the trail.
+        """
+        while len(self.trail) > length:
+            literal = self.trail.pop()
+            del self.values[literal]
+            del self.values[-literal]
+        self.head = min(self.head, length)
+
+    def propagate(self):
+        """
+        Assigns every literal forced by a clause with one unassigned literal
+        left. Returns a clause with every literal false, or None.
+        """
+        values = self.values
+        while self.head < len(self.trail):
+            false = -self.trail[self.head]
+            self.head += 1
+            watching = self.watches.get(false, [])
+            kept = []
+            for index, clause in enumerate(watching):
+                # Keep the literal that just became false second
+                if clause[0] == false:
+                    clause[0], clause[1] = clause[1], false
+                first = clause[0]
+                if values.get(first) is True:
+                    kept.append(clause)
+                    continue
+
+                # Watch some other literal that is not false instead
+                for k in range(2, len(clause)):
+                    if values.get(clause[k]) is not False:
+                        clause[1], clause[k] = clause[k], false
+                        self.watches.setdefault(clause[1], []).append(clause)
+                        break
+                else:
+                    kept.append(clause)
+                    if values.get(first) is False:
+                        kept.extend(watching[index + 1:])
+                        self.watches[false] = kept
+                        return clause
+                    self.assign(first)
+            self.watches[false] = kept
+        return None
+
+    def choose(self):
+        """
+        Returns an unassigned variable, most frequently occurring first,
+        or None if every variable is assigned.
+        """
+        if self.order is None:
+            self.order = sorted(range(1, self.variables + 1),
+                                key=lambda v: -self.occurrences.get(v, 0))
+        for variable in self.order:
+            if variable not in self.values:
+                return variable
+        return None
+
+    def solve(self, assumptions=()):
+        """
+        Returns True if the clauses and assumptions are satisfiable together,
+        setting model to a dict of variable to bool, otherwise False.
+        """
+        self.model = None
+        self.undo(0)
+        if self.inconsistent:
+            return False
+        try:
+            for literal in self.units:
+                if not self.assign(literal):
+                    return False
+            if self.propagate() is not None:
+                return False
+
+            # Each decision is (trail length before it, literal, whether its
+            # other value is still to be tried); assumptions are never flipped
+            decisions = []
+            for literal in assumptions:
+                if abs(literal) > self.variables:
+                    self.variables = abs(literal)
+                    self.order = None
+                if self.value(literal) is False:
+                    return False
+                decisions.append((len(self.trail), literal, False))
+                self.assign(literal)
+                if self.propagate() is not None:
+                    return False
+
+            while True:
+                if self.propagate() is not None:
+                    # Backtrack to the latest decision not yet flipped
+                    while decisions:
+                        length, literal, flippable = decisions.pop()
+                        self.undo(length)
+                        if flippable:
+                            decisions.append((length, -literal, False))
+                            self.assign(-literal)
+                            break
+                    else:
+                        return False
+                    continue
+
+                variable = self.choose()
+                if variable is None:
+                    self.model = {v: self.values.get(v, False)
+                                  for v in range(1, self.variables + 1)}
+                    return True
+                decisions.append((len(self.trail), -variable, True))
+                self.assign(-variable)
+        finally:
+            self.undo(0)
@@ -0,0 +1,286 @@
+"""
+Solves many knights-style puzzles from a file, printing each result as a
+JSON line as soon as it is ready.
+
+A puzzle is some knowledge and some queries, written in the syntax of
+Sentence.formula(). Input is JSON (a list of puzzle objects), JSON lines
+(one puzzle object per line) or text:
+
+    # Puzzle 1
+    (A is a Knight) ∨ (A is a Knave)
+    (A is a Knight) <=> ((A is a Knave) ∧ (B is a Knave))
+    ? A is a Knight
+    ? B is a Knave
+
+where blank lines separate puzzles, "#" lines name them and "?" lines are
+queries. Puzzle objects have "name", "knowledge" (a formula or a list of
+them) and "queries" keys. Puzzles without queries ask about every symbol.
+Each query is answered "true" if the knowledge entails it, "false" if the
+knowledge entails its negation, and otherwise "unknown". Puzzles that
+cannot be read or parsed get an "error" in place of answers, and the run
+carries on with the next one.
+
+Results are cached by a hash of each puzzle's canonical form, so running
+a suite again only solves the puzzles that changed.
+
+Usage: python solve.py [--workers N] [--cache FILE | --no-cache] [input]
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import sys
+from multiprocessing import Pool
+
+from logic import And, KnowledgeBase, Not, parse
+
+CACHE = "solve.cache"
+
+
+def read_puzzles(stream):
+    """
+    Yields each puzzle in stream as a dict with "name", "knowledge" and
+    "queries" keys, reading JSON lines and text a line at a time. Records
+    that cannot be read are yielded as a dict with "name" and "error" keys.
+    """
+    first = ""
+    for first in stream:
+        if first.strip():
+            break
+    start = first.lstrip()[:1]
+
+    if start == "[":
+        try:
+            puzzles = json.loads(first + stream.read())
+        except ValueError as error:
+            yield {"name": "Puzzle 1", "error": f"invalid JSON: {error}"}
+            return
+        for number, puzzle in enumerate(puzzles, start=1):
+            yield puzzle_from_json(puzzle, number)
+    elif start == "{":
+        number = 0
+        for line in _lines(first, stream):
+            if line.strip():
+                number += 1
+                try:
+                    puzzle = json.loads(line)
+                except ValueError as error:
+                    yield {"name": f"Puzzle {number}", "error": f"invalid JSON: {error}"}
+                    continue
+                yield puzzle_from_json(puzzle, number)
+    else:
+        puzzle = None
+        number = 0
+        for line in _lines(first, stream):
+            line = line.strip()
+            if not line:
+                if puzzle is not None:
+                    yield puzzle
+                puzzle = None
+                continue
+            if puzzle is None:
+                number += 1
+                puzzle = {"name": f"Puzzle {number}", "knowledge": [], "queries": []}
+            if line.startswith("#"):
+                puzzle["name"] = line[1:].strip()
+            elif line.startswith("?"):
+                puzzle["queries"].append(line[1:].strip())
+            else:
+                puzzle["knowledge"].append(line)
+        if puzzle is not None:
+            yield puzzle
+
+
+def _lines(first, stream):
+    """
+    Yields first, then the rest of the lines of stream.
+    """
+    yield first
+    yield from stream
+
+
+def puzzle_from_json(puzzle, number):
+    """
+    Returns a puzzle read from JSON in the form read_puzzles yields,
+    or a dict with "name" and "error" keys if it is not a puzzle object.
+    """
+    name = f"Puzzle {number}"
+    if not isinstance(puzzle, dict):
+        return {"name": name, "error": "puzzle is not an object"}
+    name = puzzle.get("name", name)
+    if not isinstance(name, str):
+        return {"name": f"Puzzle {number}", "error": "name is not a string"}
+    knowledge = puzzle.get("knowledge", [])
+    if isinstance(knowledge, str):
+        knowledge = [knowledge]
+    queries = puzzle.get("queries", [])
+    for key, value in [("knowledge", knowledge), ("queries", queries)]:
+        if not isinstance(value, list) or not all(isinstance(item, str) for item in value):
+            return {"name": name, "error": f"{key} is not a formula or a list of formulas"}
+    return {"name": name, "knowledge": knowledge, "queries": queries}
+
+
+def conjuncts(sentence):
+    """
+    Yields the sentences sentence is a conjunction of, flattening nested Ands.
+    """
+    if isinstance(sentence, And):
+        for conjunct in sentence.conjuncts:
+            yield from conjuncts(conjunct)
+    else:
+        yield sentence
+
+
+def canonical(puzzle):
+    """
+    Returns (key, knowledge, queries) for a puzzle: its knowledge as the
+    sorted distinct formulas of every conjunct, its queries as formulas in
+    the order given (every symbol if none are), and a hash of both.
+    Raises ValueError if a formula cannot be parsed.
+    """
+    knowledge = set()
+    for formula in puzzle["knowledge"]:
+        knowledge.update(sentence.formula() for sentence in conjuncts(parse(formula)))
+    knowledge = sorted(knowledge)
+    queries = [parse(query).formula() for query in puzzle["queries"]]
+    if not puzzle["queries"]:
+        symbols = set().union(*[parse(formula).symbols() for formula in knowledge])
+        queries = sorted(symbols)
+    text = json.dumps({"knowledge": knowledge, "queries": queries}, ensure_ascii=False)
+    return hashlib.sha256(text.encode("utf-8")).hexdigest(), knowledge, queries
+
+
+def answer(knowledge, queries):
+    """
+    Returns the result for canonical knowledge and queries: whether the
+    knowledge is consistent, and the answer to each query.
+    """
+    kb = KnowledgeBase(*[parse(formula) for formula in knowledge])
+    answers = []
+    for query in queries:
+        sentence = parse(query)
+        if kb.entails(sentence):
+            answers.append("true")
+        elif kb.entails(Not(sentence)):
+            answers.append("false")
+        else:
+            answers.append("unknown")
+    return {"consistent": kb.satisfiable(), "answers": answers}
+
+
+def tasks(puzzles, cache):
+    """
+    Yields (name, key, knowledge, queries, labels, result) for each puzzle,
+    result being its cached result, an error, or None if it needs solving.
+    """
+    for puzzle in puzzles:
+        if "error" in puzzle:
+            yield puzzle["name"], None, None, None, None, {"error": puzzle["error"]}
+            continue
+        labels = puzzle["queries"]
+        try:
+            key, knowledge, queries = canonical(puzzle)
+        except ValueError as error:
+            yield puzzle["name"], None, None, None, labels, {"error": str(error)}
+            continue
+        yield puzzle["name"], key, knowledge, queries, labels or queries, cache.get(key)
+
+
+def solve_task(task):
+    """
+    Pool task: returns (name, key, labels, result, whether it was solved now).
+    """
+    name, key, knowledge, queries, labels, result = task
+    if result is not None:
+        return name, key, labels, result, False
+    return name, key, labels, answer(knowledge, queries), True
+
+
+def load_cache(path):
+    """
+    Returns the dict of key to result stored in the cache file at path,
+    skipping entries that cannot be read, such as a line cut off by an
+    interrupted run.
+    """
+    cache = {}
+    if path is None or not os.path.exists(path):
+        return cache
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            if line.strip():
+                try:
+                    entry = json.loads(line)
+                    cache[entry["key"]] = entry["result"]
+                except (ValueError, KeyError, TypeError):
+                    continue
+    return cache
+
+
+def open_cache(path):
+    """
+    Opens the cache file at path for appending, first ending any partial
+    last line so that new entries start on a line of their own.
+    """
+    cache_file = open(path, "a+", encoding="utf-8")
+    if cache_file.tell() > 0:
+        with open(path, "rb") as f:
+            f.seek(-1, os.SEEK_END)
+            if f.read(1) != b"\n":
+                cache_file.write("\n")
+    return cache_file
+
+
+def solve(puzzles, cache, cache_file=None, pool=None):
+    """
+    Yields the output record for each puzzle as it is ready, adding newly
+    solved results to cache and appending them to cache_file if given.
+    """
+    work = tasks(puzzles, cache)
+    results = map(solve_task, work) if pool is None else pool.imap_unordered(solve_task, work)
+    for name, key, labels, result, solved in results:
+        output = {"name": name}
+        if "error" in result:
+            output.update(result)
+        else:
+            output["consistent"] = result["consistent"]
+            output["answers"] = dict(zip(labels, result["answers"]))
+            output["cached"] = not solved
+            # Puzzles already handed to the pool may be solved more than once
+            if solved and key not in cache:
+                cache[key] = result
+                if cache_file is not None:
+                    cache_file.write(json.dumps({"key": key, "result": result}) + "\n")
+                    cache_file.flush()
+        yield output
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Solve knights-style puzzles from a file.")
+    parser.add_argument("input", nargs="?", help="puzzle file (default: standard input)")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1,
+                        help="number of solver processes")
+    parser.add_argument("--cache", default=CACHE, help=f"result cache file (default: {CACHE})")
+    parser.add_argument("--no-cache", action="store_true", help="neither read nor write the cache")
+    args = parser.parse_args()
+
+    cache_path = None if args.no_cache else args.cache
+    cache = load_cache(cache_path)
+    stream = sys.stdin if args.input is None else open(args.input, encoding="utf-8")
+    cache_file = None if cache_path is None else open_cache(cache_path)
+    pool = None if args.workers == 1 else Pool(args.workers)
+    try:
+        for output in solve(read_puzzles(stream), cache, cache_file, pool):
+            print(json.dumps(output, ensure_ascii=False), flush=True)
+    finally:
+        if pool is not None:
+            pool.close()
+            pool.join()
+        if cache_file is not None:
+            cache_file.close()
+        if stream is not sys.stdin:
+            stream.close()
+
+
+if __name__ == "__main__":
+    main()
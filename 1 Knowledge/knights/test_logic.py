@@ -0,0 +1,316 @@
+import itertools
+import json
+import random
+
+import pytest
+
+from logic import *
+from puzzle import *
+from sat import Solver
+
+PEOPLE = [AKnight, AKnave, BKnight, BKnave, CKnight, CKnave]
+
+SOLUTIONS = [
+    (knowledge0, {AKnave}),
+    (knowledge1, {AKnave, BKnight}),
+    (knowledge2, {AKnave, BKnight}),
+    (knowledge3, {AKnight, BKnave, CKnight}),
+]
+
+
+def random_sentence(rng, symbols, depth):
+    """
+    Returns a random sentence over symbols, nested up to depth deep.
+    """
+    if depth == 0 or rng.random() < 0.2:
+        return rng.choice(symbols)
+    kind = rng.choice([Not, And, Or, Implication, Biconditional])
+    if kind is Not:
+        return Not(random_sentence(rng, symbols, depth - 1))
+    if kind in (And, Or):
+        return kind(*[random_sentence(rng, symbols, depth - 1) for _ in range(rng.randint(1, 3))])
+    return kind(random_sentence(rng, symbols, depth - 1), random_sentence(rng, symbols, depth - 1))
+
+
+RANDOM = [
+    (random_sentence(rng, symbols, 4), random_sentence(rng, symbols, 2))
+    for rng in [random.Random(0)]
+    for symbols in [[Symbol(name) for name in "pqrs"]]
+    for _ in range(200)
+]
+
+
+@pytest.mark.parametrize("knowledge,solution", SOLUTIONS)
+def test_model_check_puzzles(knowledge, solution):
+    for symbol in PEOPLE:
+        assert model_check(knowledge, symbol) == (symbol in solution)
+        assert model_check_enumerate(knowledge, symbol) == (symbol in solution)
+
+
+def test_model_check_matches_enumeration():
+    for knowledge, query in RANDOM:
+        assert model_check(knowledge, query) == model_check_enumerate(knowledge, query)
+
+
+def test_cnf_is_equisatisfiable():
+    for sentence, _ in RANDOM:
+        cnf = to_cnf(sentence)
+        names = sorted(sentence.symbols())
+        satisfiable = any(
+            sentence.evaluate(dict(zip(names, values)))
+            for values in itertools.product([True, False], repeat=len(names))
+        )
+        solver = Solver(cnf.clauses)
+        assert solver.solve() == satisfiable
+        if satisfiable:
+            model = {name: solver.model[cnf.variables[name]] for name in names}
+            assert sentence.evaluate(model)
+
+
+def test_solver_pigeonhole():
+    # 4 pigeons cannot each get one of 3 holes to themselves
+    def var(pigeon, hole):
+        return pigeon * 3 + hole + 1
+    clauses = [[var(p, h) for h in range(3)] for p in range(4)]
+    for h in range(3):
+        for p, q in itertools.combinations(range(4), 2):
+            clauses.append([-var(p, h), -var(q, h)])
+    assert not Solver(clauses).solve()
+    assert Solver(clauses[:3] + clauses[4:]).solve()
+
+
+def test_solver_assumptions():
+    solver = Solver([[1, 2], [-1, 3]])
+    assert solver.solve([-3])
+    assert solver.model[2] and not solver.model[1]
+    assert not solver.solve([-3, -2])
+    assert solver.solve([1])
+    assert solver.model[3]
+    solver.add_clause([-2])
+    assert not solver.solve([-3])
+    assert solver.solve()
+
+
+@pytest.mark.parametrize("knowledge,solution", SOLUTIONS)
+def test_knowledge_base_puzzles(knowledge, solution):
+    kb = KnowledgeBase(knowledge)
+    assert kb.satisfiable()
+    for symbol in PEOPLE:
+        assert kb.entails(symbol) == (symbol in solution)
+    assert [symbol for symbol in PEOPLE if kb.entails(Not(symbol))] == \
+        [symbol for symbol in PEOPLE if symbol not in solution and model_check(knowledge, Not(symbol))]
+
+
+def test_knowledge_base_matches_model_check():
+    for start in range(0, 200, 5):
+        kb = KnowledgeBase()
+        added = []
+        for knowledge, query in RANDOM[start:start + 5]:
+            kb.add(knowledge)
+            added.append(knowledge)
+            assert kb.entails(query) == model_check_enumerate(And(*added), query)
+
+
+def test_knowledge_base_reuses_models():
+    kb = KnowledgeBase(knowledge3)
+    solves = 0
+    solve = kb.solver.solve
+
+    def counting(*args):
+        nonlocal solves
+        solves += 1
+        return solve(*args)
+    kb.solver.solve = counting
+    for symbol in PEOPLE:
+        kb.entails(symbol)
+    assert solves <= 4
+
+
+def test_truth_table_matches_enumeration():
+    for knowledge, query in RANDOM:
+        assert model_check_truth_table(knowledge, query) == model_check_enumerate(knowledge, query)
+
+
+@pytest.mark.parametrize("count", [17, 20])
+def test_truth_table_blocks(count):
+    rng = random.Random(count)
+    symbols = [Symbol(f"p{i}") for i in range(count)]
+    for _ in range(3):
+        knowledge = And(*[Or(*[rng.choice([s, Not(s)]) for s in rng.sample(symbols, 3)])
+                          for _ in range(3 * count)])
+        for query in [symbols[0], Or(symbols[-1], Not(symbols[1]))]:
+            cnf = to_cnf(knowledge)
+            cnf.add(Not(query))
+            assert model_check_truth_table(knowledge, query) == (not Solver(cnf.clauses).solve())
+    chain = And(symbols[0], *[Implication(a, b) for a, b in zip(symbols, symbols[1:])])
+    assert model_check_truth_table(chain, symbols[-1])
+
+
+def test_interned_sharing():
+    import interned
+    a, b = interned.Symbol("a"), interned.Symbol("b")
+    sentence = interned.And(a, interned.Or(a, interned.Not(b)))
+    assert sentence is interned.And(interned.Symbol("a"), interned.Or(a, interned.Not(interned.Symbol("b"))))
+    assert sentence is interned.intern(And(Symbol("a"), Or(Symbol("a"), Not(Symbol("b")))))
+    assert sentence == And(Symbol("a"), Or(Symbol("a"), Not(Symbol("b"))))
+    assert hash(sentence) == hash(And(Symbol("a"), Or(Symbol("a"), Not(Symbol("b")))))
+    assert sentence is not interned.And(interned.Or(a, interned.Not(b)), a)
+    assert sentence.symbols() == {"a", "b"}
+    assert sentence.symbols() is interned.Or(a, interned.Not(b)).symbols()
+
+
+def test_interned_is_immutable():
+    import pickle
+    import interned
+    sentence = interned.And(interned.Symbol("a"), interned.Symbol("b"))
+    with pytest.raises(TypeError):
+        sentence.add(interned.Symbol("c"))
+    with pytest.raises(AttributeError):
+        sentence.conjuncts = ()
+    assert pickle.loads(pickle.dumps(sentence)) is sentence
+
+
+@pytest.mark.parametrize("knowledge,solution", SOLUTIONS)
+def test_interned_puzzles(knowledge, solution):
+    import interned
+    knowledge = interned.intern(knowledge)
+    kb = KnowledgeBase(knowledge)
+    for symbol in PEOPLE:
+        assert model_check(knowledge, interned.intern(symbol)) == (symbol in solution)
+        assert kb.entails(interned.intern(symbol)) == (symbol in solution)
+
+
+def test_compiled_matches_evaluate():
+    for knowledge, query in RANDOM:
+        sentence = Implication(query, knowledge)
+        names = sorted(sentence.symbols())
+        positional = sentence.compile()
+        bitmask = sentence.compile(names, bitmask=True)
+        for mask in range(2 ** len(names)):
+            values = [bool(mask >> i & 1) for i in range(len(names))]
+            expected = sentence.evaluate(dict(zip(names, values)))
+            assert positional(*values) == bitmask(mask) == expected
+
+
+def test_compiled_deep_nesting():
+    symbols = [Symbol(f"p{i}") for i in range(100)]
+    sentence = symbols[0]
+    for symbol in symbols[1:]:
+        sentence = Or(And(Implication(sentence, symbol), Biconditional(symbol, symbols[0])), Not(symbol))
+    names = [symbol.name for symbol in symbols]
+    function = compile_sentence(sentence, names)
+    rng = random.Random(0)
+    for _ in range(20):
+        values = [rng.random() < 0.5 for _ in names]
+        assert function(*values) == sentence.evaluate(dict(zip(names, values)))
+
+
+def test_model_check_parallel():
+    from parallel import model_check_parallel
+    for knowledge, query in RANDOM:
+        assert model_check_parallel(knowledge, query, workers=1, split=2) == model_check(knowledge, query)
+    for knowledge, query in RANDOM[:10]:
+        assert model_check_parallel(knowledge, query, workers=2) == model_check(knowledge, query)
+
+
+def test_count_models():
+    from parallel import count_models
+    assert count_models(knowledge0, workers=1) == 1
+    assert count_models(knowledge3, workers=2) == 1
+    assert count_models(knowledge1, workers=1, symbols=["C is a Knight"]) == 2
+    for knowledge, _ in RANDOM[:50]:
+        names = sorted(knowledge.symbols())
+        expected = sum(
+            knowledge.evaluate(dict(zip(names, values)))
+            for values in itertools.product([True, False], repeat=len(names))
+        )
+        assert count_models(knowledge, workers=1, split=1) == expected
+
+
+def test_parse_round_trip():
+    for knowledge, query in RANDOM:
+        for sentence in [knowledge, query]:
+            parsed = parse(sentence.formula())
+            names = sorted(sentence.symbols())
+            for values in itertools.product([True, False], repeat=len(names)):
+                model = dict(zip(names, values))
+                assert parsed.evaluate(model) == sentence.evaluate(model)
+    for knowledge, _ in SOLUTIONS:
+        assert parse(knowledge.formula()) == knowledge
+    assert parse("a & ~(b | c) => d <=> e") == Biconditional(
+        Implication(And(Symbol("a"), Not(Or(Symbol("b"), Symbol("c")))), Symbol("d")), Symbol("e"))
+    with pytest.raises(ValueError):
+        parse("(a ∧ b")
+    with pytest.raises(ValueError):
+        parse("a ∨")
+
+
+def test_solve_puzzles():
+    import io
+    import solve
+    text = io.StringIO(
+        "# chain\n"
+        "a => b\n"
+        "(b) => (c)\n"
+        "a\n"
+        "? c\n"
+        "? ¬d\n"
+        "\n"
+        "# same chain\n"
+        "a ∧ (a => b)\n"
+        "b => c\n"
+        "? c\n"
+        "? ~ d\n"
+    )
+    puzzles = list(solve.read_puzzles(text))
+    assert [puzzle["name"] for puzzle in puzzles] == ["chain", "same chain"]
+    first, second = [solve.canonical(puzzle) for puzzle in puzzles]
+    assert first == second
+    assert solve.answer(first[1], first[2]) == {"consistent": True, "answers": ["true", "unknown"]}
+
+    lines = io.StringIO("\n".join(
+        json.dumps({"name": f"Puzzle {i}", "knowledge": knowledge.formula()}) for i, (knowledge, _) in enumerate(SOLUTIONS)
+    ))
+    for puzzle, (_, solution) in zip(solve.read_puzzles(lines), SOLUTIONS):
+        key, knowledge, queries = solve.canonical(puzzle)
+        result = solve.answer(knowledge, queries)
+        assert {query for query, answer in zip(queries, result["answers"]) if answer == "true"} == \
+            {symbol.name for symbol in solution}
+
+
+def test_solve_bad_records_and_cache():
+    import io
+    import solve
+    lines = io.StringIO(
+        '{"name": "chain", "knowledge": "a ∧ (a => b)", "queries": ["b"]}\n'
+        'not json\n'
+        '{"knowledge": 5}\n'
+        '{"name": "unparsable", "knowledge": "a ∧"}\n'
+        '{"name": "chain again", "knowledge": ["a => b", "a"], "queries": ["b"]}\n'
+    )
+    cache = {}
+    outputs = list(solve.solve(solve.read_puzzles(lines), cache))
+    assert [output["name"] for output in outputs] == \
+        ["chain", "Puzzle 2", "Puzzle 3", "unparsable", "chain again"]
+    assert [output.get("cached") for output in outputs] == [False, None, None, None, True]
+    assert all("error" in output for output in outputs[1:4])
+    assert outputs[4]["answers"] == {"b": "true"}
+    assert len(cache) == 1
+
+    outputs = list(solve.solve(solve.read_puzzles(io.StringIO("[1, 2")), {}))
+    assert "error" in outputs[0]
+
+
+def test_solve_truncated_cache(tmp_path):
+    import io
+    import solve
+    path = tmp_path / "solve.cache"
+    path.write_text('{"key": "abc", "res', encoding="utf-8")
+    cache = solve.load_cache(path)
+    assert cache == {}
+
+    with solve.open_cache(path) as cache_file:
+        lines = io.StringIO('{"name": "chain", "knowledge": "a ∧ (a => b)", "queries": ["b"]}\n')
+        list(solve.solve(solve.read_puzzles(lines), cache, cache_file))
+    assert solve.load_cache(path) == cache
+    assert len(cache) == 1
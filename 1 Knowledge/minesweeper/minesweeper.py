@@ -105,16 +105,17 @@ class Sentence():
         """
         Returns the set of all cells in self.cells known to be mines.
         """
-        if      self.count == 0:                    return set()                                    # eg. in a 3x3, when {D, E, G} = 0 
-        elif    self.count == len(self.cells):      return set(cell for cell in self.cells)         # "   "  "  "    "   {E, F, H} = 3
-            
+        if self.cells and self.count == len(self.cells):
+            return set(self.cells)
+        return set()
 
     def known_safes(self):
         """
         Returns the set of all cells in self.cells known to be safe.
         """
-        if      self.count == 0:                    return set(cell for cell in self.cells)         # eg. in a 3x3, when {E, F, H} = 0
-        elif    self.count == len(self.cells):      return set()                                    # "   "  "  "    "   {D, E, G} = 3 
+        if self.count == 0:
+            return set(self.cells)
+        return set()
 
     def mark_mine(self, cell):
         """
@@ -130,13 +131,18 @@ class Sentence():
         Updates internal knowledge representation given the fact that
         a cell is known to be safe.
         """
-        # print(f'sentence.mark_safe() : {cell=} and {self.cells=}')
         self.cells.discard(cell)
 
 
 class MinesweeperAI():
     """
     Minesweeper game player
+
+    Knowledge is kept as a dict from each sentence's cells to its count,
+    with an index from every cell to the sentences containing it. New
+    facts go on a worklist, and inference only revisits the sentences
+    that share a cell with something that changed, so each move costs
+    time proportional to the neighborhood it affects.
     """
 
     def __init__(self, height=8, width=8):
@@ -152,31 +158,104 @@ class MinesweeperAI():
         self.mines = set()
         self.safes = set()
 
-        # List of sentences about the game known to be true
-        self.knowledge = []
+        # Sentences about the game known to be true, as frozenset of
+        # cells -> count, none of them empty, resolved or duplicated
+        self.sentences = {}
+
+        # Cell -> the cell sets of the sentences containing it
+        self.containing = {}
+
+        # (cells, count) sentences waiting to be added
+        self.pending = []
+
+    @property
+    def knowledge(self):
+        """
+        List of sentences about the game known to be true.
+        """
+        return [Sentence(cells, count) for cells, count in self.sentences.items()]
 
     def mark_mine(self, cell):
         """
         Marks a cell as a mine, and updates all knowledge
         to mark that cell as a mine as well.
         """
-        self.mines.add(cell)
-        for sentence in self.knowledge:
-            sentence.mark_mine(cell)
+        self.resolve(cell, True)
+        self.infer()
 
     def mark_safe(self, cell):
         """
         Marks a cell as safe, and updates all knowledge
         to mark that cell as safe as well.
         """
-        self.safes.add(cell)
-        for sentence in self.knowledge:
-            sentence.mark_safe(cell)
+        self.resolve(cell, False)
+        self.infer()
+
+    def resolve(self, cell, mine):
+        """
+        Records whether cell is a mine, and queues every sentence that
+        contains it again without it.
+        """
+        if cell in self.mines or cell in self.safes:
+            return
+        (self.mines if mine else self.safes).add(cell)
+        for cells in list(self.containing.get(cell, ())):
+            count = self.forget(cells)
+            self.pending.append((cells - {cell}, count - mine))
+
+    def store(self, cells, count):
+        """
+        Adds the sentence cells = count to the knowledge and the index.
+        """
+        self.sentences[cells] = count
+        for cell in cells:
+            self.containing.setdefault(cell, set()).add(cells)
+
+    def forget(self, cells):
+        """
+        Removes the sentence about cells from the knowledge and the index,
+        returning its count.
+        """
+        for cell in cells:
+            related = self.containing[cell]
+            related.discard(cells)
+            if not related:
+                del self.containing[cell]
+        return self.sentences.pop(cells)
+
+    def infer(self):
+        """
+        Adds pending sentences to the knowledge, marking the cells they
+        resolve and queuing what follows from them, until nothing is left.
+        """
+        while self.pending:
+            cells, count = self.pending.pop()
+
+            # Drop cells resolved since the sentence was queued
+            count -= len(cells & self.mines)
+            cells = frozenset(cells - self.mines - self.safes)
+            if not cells or cells in self.sentences:
+                continue
+            if count == 0 or count == len(cells):
+                for cell in cells:
+                    self.resolve(cell, count > 0)
+                continue
+
+            # Only sentences sharing a cell can be subsets or supersets
+            related = set()
+            for cell in cells:
+                related.update(self.containing.get(cell, ()))
+            self.store(cells, count)
+            for other in related:
+                if other < cells:
+                    self.pending.append((cells - other, count - self.sentences[other]))
+                elif cells < other:
+                    self.pending.append((other - cells, self.sentences[other] - count))
 
     def add_knowledge(self, cell, count):
         """
         Called when the Minesweeper board tells us, for a given
-        safe cell, how many neighboring cells have mines in them. 
+        safe cell, how many neighboring cells have mines in them.
 
         This function should:
             1) mark the cell as a move that has been made
@@ -187,57 +266,19 @@ class MinesweeperAI():
                if it can be concluded based on the AI's knowledge base
             5) add any new sentences to the AI's knowledge base
                if they can be inferred from existing knowledge
-        """      
-        # print('Before marking, knowledge')
-        # for sentence in self.knowledge: print(f'\t{sentence}') 
-
-        print(f'Marking {cell} as move made and safe')
+        """
         self.moves_made.add(cell)
-        self.mark_safe(cell)       
+        self.resolve(cell, False)
 
         neighbors = set()
-        i,j = cell
-        for row in [i-1, i, i+1]:
-            for col in [j-1, j, j+1]:
-                if  (row, col) != (i, j) and                \
-                    0 <= row and row < self.width and       \
-                    0 <= col and col < self.height: 
-                        neighbors.add((row,col))
-        print(f'Clicked on {cell} with {neighbors=}')
-
-        self.knowledge.append(Sentence(neighbors, count))
-        # print('After finding neighbors, knowledge')
-        # for sentence in self.knowledge: print(f'\t{sentence}')
-
-        print('Marking cells')
-        for sentence in self.knowledge:
-            # print(f'{sentence}')
-            knwn_safes = sentence.known_safes() or set()            #;print(f'{knwn_safes=}')
-            for safe in knwn_safes: self.mark_safe(safe)            #;print(f'Marking {safe} as safe')
-            knwn_mines = sentence.known_mines() or set()            #;print(f'{knwn_mines=}')
-            for mine in knwn_mines: self.mark_mine(mine)            #;print(f'Marking {mine} as mine')
-        print(f'{self.safes=}')
-        print(f'{self.mines=}')
-
-        # print('After marking cells, knowledge')
-        # for sentence in self.knowledge: print(f'\t{sentence}')
-
-        print('Trying to infer new knowledge')
-        for sentence1 in self.knowledge:
-            for sentence2 in self.knowledge:
-                if not sentence1.__eq__(sentence2) and sentence1.cells and sentence2.cells: 
-                    if sentence1.cells.issubset(sentence2.cells):
-                        # print(f'{sentence1}')
-                        # print(f'{sentence2}')
-                        newSet = sentence1.cells.difference(sentence2.cells)        #;print(f'{newSet=}')
-                        newCount = abs(sentence1.count - sentence2.count)           #;print(f'{newCount=}')
-                        self.knowledge.append(Sentence(newSet, newCount))
-                    elif sentence2.cells.issubset(sentence1.cells):
-                        # print(f'{sentence1}')
-                        # print(f'{sentence2}')
-                        newSet = sentence2.cells.difference(sentence1.cells)        #;print(f'{newSet=}')
-                        newCount = abs(sentence2.count - sentence1.count)           #;print(f'{newCount=}')
-                        self.knowledge.append(Sentence(newSet, newCount))
+        i, j = cell
+        for row in [i - 1, i, i + 1]:
+            for col in [j - 1, j, j + 1]:
+                if (row, col) != (i, j) and 0 <= row < self.height and 0 <= col < self.width:
+                    neighbors.add((row, col))
+
+        self.pending.append((neighbors, count))
+        self.infer()
 
     def make_safe_move(self):
         """
@@ -247,15 +288,12 @@ class MinesweeperAI():
 
         This function may use the knowledge in self.mines, self.safes
         and self.moves_made, but should not modify any of those values.
-        """        
-        # print(f'make_safe_move() : {self.safes=}')
-        # print(f'make_safe_move() : {self.moves_made=}')
-        options = self.safes.difference(self.moves_made)    ;print(f'make_safe_move() : {options=}')
-
-        if options: return random.sample(options,1)[0]
+        """
+        options = self.safes - self.moves_made
+        if options:
+            return random.choice(tuple(options))
         return None
 
-
     def make_random_move(self):
         """
         Returns a move to make on the Minesweeper board.
@@ -263,7 +301,8 @@ class MinesweeperAI():
             1) have not already been chosen, and
             2) are not known to be mines
         """
-        options = tuple((i,j) for i in range(self.width) for j in range(self.height) if (i,j) not in self.moves_made and (i,j) not in self.mines)
-        print(f'make_random_move() : {options=}')
-        if options: return random.choice(options)
-        return None
\ No newline at end of file
+        options = tuple((i, j) for i in range(self.height) for j in range(self.width)
+                        if (i, j) not in self.moves_made and (i, j) not in self.mines)
+        if options:
+            return random.choice(options)
+        return None
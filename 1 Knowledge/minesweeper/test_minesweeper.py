@@ -0,0 +1,73 @@
+import random
+import time
+
+import pytest
+
+from minesweeper import *
+
+
+def play(height, width, mines, seed):
+    """
+    Plays one game with the AI, checking that everything it infers is true.
+    Returns the AI, the game and whether the AI hit a mine.
+    """
+    random.seed(seed)
+    game = Minesweeper(height=height, width=width, mines=mines)
+    ai = MinesweeperAI(height=height, width=width)
+    while True:
+        move = ai.make_safe_move()
+        if move is None:
+            move = ai.make_random_move()
+            if move is None:
+                return ai, game, False
+        elif game.is_mine(move):
+            pytest.fail(f"safe move {move} is a mine")
+        if game.is_mine(move):
+            return ai, game, True
+        ai.add_knowledge(move, game.nearby_mines(move))
+        assert ai.mines <= game.mines
+        assert not ai.safes & game.mines
+
+
+def test_add_knowledge_infers_safes():
+    ai = MinesweeperAI(height=3, width=3)
+    ai.add_knowledge((0, 0), 0)
+    assert ai.safes >= {(0, 0), (0, 1), (1, 0), (1, 1)}
+    assert not ai.knowledge
+
+
+def test_add_knowledge_subset_inference():
+    # The corner cell (0, 2) must be the only mine next to (1, 2)
+    ai = MinesweeperAI(height=3, width=4)
+    ai.add_knowledge((0, 0), 0)
+    ai.add_knowledge((2, 0), 0)
+    ai.add_knowledge((1, 1), 1)
+    ai.add_knowledge((0, 1), 1)
+    ai.add_knowledge((2, 1), 0)
+    assert (0, 2) in ai.mines
+    assert {(1, 2), (2, 2)} <= ai.safes
+
+
+def test_neighbors_on_wide_board():
+    ai = MinesweeperAI(height=2, width=6)
+    ai.add_knowledge((1, 5), 0)
+    assert ai.safes == {(0, 4), (0, 5), (1, 4), (1, 5)}
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_knowledge_stays_clean(seed):
+    ai, game, _ = play(16, 30, 99, seed)
+    cells = [frozenset(sentence.cells) for sentence in ai.knowledge]
+    assert len(cells) == len(set(cells))
+    for sentence in ai.knowledge:
+        assert sentence.cells
+        assert 0 < sentence.count < len(sentence.cells)
+        assert not sentence.cells & (ai.mines | ai.safes)
+        assert sum(cell in game.mines for cell in sentence.cells) == sentence.count
+
+
+def test_large_board_is_interactive():
+    start = time.perf_counter()
+    for seed in range(5):
+        play(16, 30, 99, seed)
+    assert time.perf_counter() - start < 5